@@ -1,4 +1,5 @@
 import maya.cmds as cmds
+import maya.api.OpenMaya as om
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,7 +8,11 @@ import maya.cmds as cmds
 
 
 def _resolve_joint(joint_name_or_none):
-    """返回关节的长路径；支持 None(用选择)、短名、含命名空间、层级中的短名。"""
+    """返回关节的长路径；支持 None(用选择)、短名、含命名空间、层级中的短名、MDagPath。"""
+    if isinstance(joint_name_or_none, om.MDagPath):
+        # 已经解析过的路径，省去按名字的 ls 查找；后续的 cmds 调用仍使用其长路径名
+        return joint_name_or_none.fullPathName()
+
     if joint_name_or_none is None:
         sel = cmds.ls(sl=True, type='joint', long=True) or cmds.ls(sl=True, long=True) or []
         if not sel:
@@ -196,6 +201,31 @@ def setup_elbow_avg_push(
 
 # setup_elbow_avg_push()  # Commented out - don't execute on module import
 
+class BatchCancelled(Exception):
+    """Raised from a progress callback to stop a batch before it finishes"""
+
+
+class BatchProcessor(object):
+    """
+    Queue scene edits by level and run them level by level, e.g. all the node creation (level 0) before any
+    attribute setup or connection (level 1), so the dependency graph is only wired up once every node exists.
+    """
+
+    def __init__(self, levels=2):
+        self._queues = [[] for _ in range(levels)]
+
+    def add(self, level, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) on the given level"""
+        self._queues[level].append((fn, args, kwargs))
+
+    def flush(self):
+        """Run all the queued calls, level by level in the order they were added, and empty the queues"""
+        for queue in self._queues:
+            for fn, args, kwargs in queue:
+                fn(*args, **kwargs)
+            del queue[:]
+
+
 def createAvgPushJointForFinger(finger_joint, driver_joint=None, weight=0.5,
                                 driver_axis='z', distance_axis='y', scale_axis='x',
                                 driver_value=90, distance_value=5, scale_value=0.2,
@@ -210,8 +240,8 @@ def createAvgPushJointForFinger(finger_joint, driver_joint=None, weight=0.5,
         JOLeftThumbMid1 -> LeftThumbMidAvg, LeftThumbMidPush
         JOLeftIndexBase1 -> LeftIndexBaseAvg, LeftIndexBasePush
 
-    :param finger_joint: Target finger joint (e.g., JOLeftThumbMid1, JOLeftElbow1)
-    :param driver_joint: Parent/driver joint (if None, uses parent of finger_joint)
+    :param finger_joint: Target finger joint name (e.g., JOLeftThumbMid1, JOLeftElbow1) or MDagPath
+    :param driver_joint: Parent/driver joint name or MDagPath (if None, uses parent of finger_joint)
     :param weight: Weight for average - how much rotation from target joint (0.5 = half)
     :param driver_axis: Rotation axis that drives the push (twist axis) ('x', 'y', or 'z')
     :param distance_axis: Axis along which joint pushes out (push axis) ('x', 'y', or 'z')
@@ -226,6 +256,22 @@ def createAvgPushJointForFinger(finger_joint, driver_joint=None, weight=0.5,
     :param output_max: RemapValue output maximum (translation distance)
     :return: Tuple of (avg_joint, push_joint) or (avg_joint, None) if create_push is False
     """
+    joints = _createAvgPushJoints(finger_joint, driver_joint=driver_joint, create_push=create_push)
+    _connectAvgPushJoints(joints, weight=weight, driver_axis=driver_axis, distance_axis=distance_axis,
+                          input_min=input_min, input_max=input_max, output_min=output_min, output_max=output_max)
+    return joints['avg_joint'], joints['push_joint']
+
+
+def _createAvgPushJoints(finger_joint, driver_joint=None, create_push=True):
+    """
+    Create the average (and push) joint of a finger joint and match them to it, without connecting them.
+
+    :param finger_joint: Target finger joint name (e.g., JOLeftThumbMid1, JOLeftElbow1) or MDagPath
+    :param driver_joint: Parent/driver joint name or MDagPath (if None, uses parent of finger_joint)
+    :param create_push: Whether to create push joint (default True)
+    :return: Dictionary with the resolved 'finger_joint', the 'avg_joint' and 'push_joint' (None if create_push is
+             False) and their 'avg_name' and 'push_name'
+    """
     # Resolve finger joint using the same logic as setup_elbow_avg_push
     finger_joint = _resolve_joint(finger_joint)
 
@@ -262,19 +308,20 @@ def createAvgPushJointForFinger(finger_joint, driver_joint=None, weight=0.5,
     avg_name = f"{base_name}Avg"
     push_name = f"{base_name}Push"
 
-    # Create/get Avg and Push joints (same as setup_elbow_avg_push)
-    def ensure_joint(name):
+    # Create/get Avg and Push joints under their parent. New joints are created in place and without
+    # selecting them, so there is no reparent and no selection change per joint
+    def ensure_joint(name, parent):
         if cmds.objExists(name):
-            return cmds.ls(name, long=True)[0]
-        return cmds.createNode('joint', name=name)
+            jnt = cmds.ls(name, long=True)[0]
+            try:
+                cmds.parent(jnt, parent)
+            except:
+                pass
+            return jnt
+        return cmds.createNode('joint', name=name, parent=parent, skipSelect=True)
 
-    avg_jnt = ensure_joint(avg_name)
-
-    # Parent avg joint to finger's parent
-    try:
-        cmds.parent(avg_jnt, finger_parent)
-    except:
-        pass
+    # Avg joint under finger's parent
+    avg_jnt = ensure_joint(avg_name, finger_parent)
 
     # Match transform to finger joint
     m = cmds.xform(finger_joint, q=True, ws=True, m=True)
@@ -310,33 +357,11 @@ def createAvgPushJointForFinger(finger_joint, driver_joint=None, weight=0.5,
             cmds.setAttr(attr_path, lock=False)
         cmds.setAttr(attr_path, 0)
 
-    # Avg inherits weighted rotation from the target finger/elbow joint (NOT the driver/parent)
-    # Using the same approach as setup_elbow_avg_push: multiply rotation by weight factor
-    driver_axis_upper = driver_axis.upper()
-
-    # Create multDoubleLinear node to apply weight to target joint's rotation
-    # IMPORTANT: Connect from finger_joint (target), not driver_joint (parent)
-    weight_mdl = cmds.createNode('multDoubleLinear', name=f'{avg_name}_weight_{driver_axis}_mdl')
-    cmds.setAttr(weight_mdl + '.input2', weight)
-    # Connect target joint's rotation (e.g., JOLeftElbow1.rotateX), not parent's rotation
-    cmds.connectAttr(f'{finger_joint}.rotate{driver_axis_upper}', weight_mdl + '.input1', f=True)
-
-    # Connect weighted rotation to avg joint
-    rot_attr = f'{avg_jnt}.rotate{driver_axis_upper}'
-    if cmds.getAttr(rot_attr, lock=True):
-        cmds.setAttr(rot_attr, lock=False)
-    cmds.connectAttr(weight_mdl + '.output', rot_attr, f=True)
-
     # Create push joint if requested
     push_jnt = None
     if create_push:
-        push_jnt = ensure_joint(push_name)
-
-        # Parent push to avg
-        try:
-            cmds.parent(push_jnt, avg_jnt)
-        except:
-            pass
+        # Push joint under avg
+        push_jnt = ensure_joint(push_name, avg_jnt)
 
         # Match transform to avg joint
         for attr in ('t', 'r', 's'):
@@ -371,10 +396,54 @@ def createAvgPushJointForFinger(finger_joint, driver_joint=None, weight=0.5,
                 cmds.setAttr(attr_path, lock=False)
             cmds.setAttr(attr_path, 0)
 
+    return {'finger_joint': finger_joint, 'avg_joint': avg_jnt, 'push_joint': push_jnt,
+            'avg_name': avg_name, 'push_name': push_name}
+
+
+def _connectAvgPushJoints(joints, weight=0.5, driver_axis='z', distance_axis='y',
+                          input_min=0.0, input_max=90.0, output_min=0.0, output_max=5.0):
+    """
+    Connect the joints created by _createAvgPushJoints: the average joint inherits the weighted rotation of the
+    finger joint and the push joint is pushed out by a remapValue of the average joint rotation.
+
+    :param joints: Dictionary returned by _createAvgPushJoints
+    :param weight: Weight for average - how much rotation from target joint (0.5 = half)
+    :param driver_axis: Rotation axis that drives the push (twist axis) ('x', 'y', or 'z')
+    :param distance_axis: Axis along which joint pushes out (push axis) ('x', 'y', or 'z')
+    :param input_min: RemapValue input minimum (rotation in degrees)
+    :param input_max: RemapValue input maximum (rotation in degrees)
+    :param output_min: RemapValue output minimum (translation distance)
+    :param output_max: RemapValue output maximum (translation distance)
+    """
+    finger_joint = joints['finger_joint']
+    avg_jnt = joints['avg_joint']
+    push_jnt = joints['push_joint']
+    avg_name = joints['avg_name']
+    push_name = joints['push_name']
+
+    # Avg inherits weighted rotation from the target finger/elbow joint (NOT the driver/parent)
+    # Using the same approach as setup_elbow_avg_push: multiply rotation by weight factor
+    driver_axis_upper = driver_axis.upper()
+
+    # Create multDoubleLinear node to apply weight to target joint's rotation
+    # IMPORTANT: Connect from finger_joint (target), not driver_joint (parent)
+    weight_mdl = cmds.createNode('multDoubleLinear', name=f'{avg_name}_weight_{driver_axis}_mdl', skipSelect=True)
+    cmds.setAttr(weight_mdl + '.input2', weight)
+    # Connect target joint's rotation (e.g., JOLeftElbow1.rotateX), not parent's rotation
+    cmds.connectAttr(f'{finger_joint}.rotate{driver_axis_upper}', weight_mdl + '.input1', f=True)
+
+    # Connect weighted rotation to avg joint
+    rot_attr = f'{avg_jnt}.rotate{driver_axis_upper}'
+    if cmds.getAttr(rot_attr, lock=True):
+        cmds.setAttr(rot_attr, lock=False)
+    cmds.connectAttr(weight_mdl + '.output', rot_attr, f=True)
+
+    if push_jnt is not None:
         # Setup remapValue node to drive push translation (same pattern as setup_elbow_avg_push)
         distance_axis_upper = distance_axis.upper()
 
-        rmp = cmds.createNode('remapValue', name=f'{avg_name}_r{driver_axis}_to_{push_name}_t{distance_axis}_rmp')
+        rmp = cmds.createNode('remapValue', name=f'{avg_name}_r{driver_axis}_to_{push_name}_t{distance_axis}_rmp',
+                              skipSelect=True)
         # Use the remap parameters from UI
         cmds.setAttr(rmp + '.inputMin', float(input_min))
         cmds.setAttr(rmp + '.inputMax', float(input_max))
@@ -395,7 +464,7 @@ def createAvgPushJointForFinger(finger_joint, driver_joint=None, weight=0.5,
 
         if is_right_side:
             # For right side, multiply by -1 to invert the translation direction
-            invert_mdl = cmds.createNode('multDoubleLinear', name=f'{push_name}_t{distance_axis}_invert_mdl')
+            invert_mdl = cmds.createNode('multDoubleLinear', name=f'{push_name}_t{distance_axis}_invert_mdl', skipSelect=True)
             cmds.setAttr(invert_mdl + '.input2', -1.0)
             cmds.connectAttr(rmp + '.outValue', invert_mdl + '.input1', f=True)
             cmds.connectAttr(invert_mdl + '.output', translate_attr, f=True)
@@ -403,7 +472,24 @@ def createAvgPushJointForFinger(finger_joint, driver_joint=None, weight=0.5,
             # For left side, connect directly
             cmds.connectAttr(rmp + '.outValue', translate_attr, f=True)
 
-    return avg_jnt, push_jnt
+
+def _planBatchTargets(sides, fingers, include_limbs=True):
+    """
+    List the names of the target joints of a batch, without touching the scene: all three finger segments
+    Base, Mid, Tip, and the elbow and knee joints only if include_limbs is True.
+
+    :param sides: List of sides, 'Left' and/or 'Right'
+    :param fingers: List of finger names
+    :param include_limbs: Whether to include elbows and knees
+    :return: List of joint names, per side in finger order
+    """
+    digits = ['Base', 'Mid', 'Tip']
+    candidates = []
+    for current_side in sides:
+        candidates += [f'JO{current_side}{finger}{digit}1' for finger in fingers for digit in digits]
+        if include_limbs:
+            candidates += [f'JO{current_side}Elbow1', f'JO{current_side}Knee1']
+    return candidates
 
 
 def batchCreateAllAvgPush(side='Both', fingers=None, weight=0.5,
@@ -411,7 +497,7 @@ def batchCreateAllAvgPush(side='Both', fingers=None, weight=0.5,
                           driver_value=90, distance_value=5, scale_value=0.2,
                           input_min=0.0, input_max=90.0,
                           output_min=0.0, output_max=5.0,
-                          include_limbs=True):
+                          include_limbs=True, progress_callback=None):
     """
     Batch create average and push joints for all fingers, and optionally elbows and knees.
 
@@ -429,6 +515,9 @@ def batchCreateAllAvgPush(side='Both', fingers=None, weight=0.5,
     :param output_min: RemapValue output minimum
     :param output_max: RemapValue output maximum
     :param include_limbs: Whether to include elbows and knees (default True)
+    :param progress_callback: Called as progress_callback(done, total, joint) after each step, where every target
+                              joint has a create and a connect step. It may raise BatchCancelled to stop the batch,
+                              the exception is passed on to the caller
     :return: Dictionary of created joints with structure {joint_name: {'avg': avg_joint, 'push': push_joint}}
     """
     if fingers is None:
@@ -440,73 +529,62 @@ def batchCreateAllAvgPush(side='Both', fingers=None, weight=0.5,
     else:
         sides_to_process = [side]
 
+    # Plan the target joint names up front, then keep the existing ones. They are resolved to MDagPaths once here,
+    # so creating their avg/push joints doesn't look the names up again
+    target_joints = []
+    for jnt in _planBatchTargets(sides_to_process, fingers, include_limbs=include_limbs):
+        sel = om.MSelectionList()
+        try:
+            sel.add(jnt)
+        except RuntimeError:
+            logger.debug('Joint does not exist: %s', jnt)
+            continue
+        target_joints.append((jnt, sel.getDagPath(0)))
+
     created_joints = {}
-    success_count = 0
-    fail_count = 0
-
-    for current_side in sides_to_process:
-        # Process fingers - all three segments: Base, Mid, Tip
-        digits = ['Base', 'Mid', 'Tip']
-        for finger in fingers:
-            for digit in digits:
-                jnt = f'JO{current_side}{finger}{digit}1'
-                if cmds.objExists(jnt):
-                    try:
-                        avg_jnt, push_jnt = createAvgPushJointForFinger(
-                            jnt,
-                            driver_joint=None,  # Will auto-detect parent
-                            weight=weight,
-                            driver_axis=driver_axis,
-                            distance_axis=distance_axis,
-                            scale_axis=scale_axis,
-                            driver_value=driver_value,
-                            distance_value=distance_value,
-                            scale_value=scale_value,
-                            create_push=True,
-                            input_min=input_min,
-                            input_max=input_max,
-                            output_min=output_min,
-                            output_max=output_max
-                        )
-                        created_joints[jnt] = {'avg': avg_jnt, 'push': push_jnt}
-                        logger.info(f'Created avg/push for {jnt}')
-                        success_count += 1
-                    except Exception as e:
-                        logger.warning(f'Failed to create avg/push for {jnt}: {e}')
-                        fail_count += 1
-                else:
-                    logger.debug(f'Joint does not exist: {jnt}')
-
-        # Process elbow and knee joints (only if include_limbs is True)
-        if include_limbs:
-            limb_joints = [f'JO{current_side}Elbow1', f'JO{current_side}Knee1']
-            for jnt in limb_joints:
-                if cmds.objExists(jnt):
-                    try:
-                        avg_jnt, push_jnt = createAvgPushJointForFinger(
-                            jnt,
-                            driver_joint=None,  # Will auto-detect parent
-                            weight=weight,
-                            driver_axis=driver_axis,
-                            distance_axis=distance_axis,
-                            scale_axis=scale_axis,
-                            driver_value=driver_value,
-                            distance_value=distance_value,
-                            scale_value=scale_value,
-                            create_push=True,
-                            input_min=input_min,
-                            input_max=input_max,
-                            output_min=output_min,
-                            output_max=output_max
-                        )
-                        created_joints[jnt] = {'avg': avg_jnt, 'push': push_jnt}
-                        logger.info(f'Created avg/push for {jnt}')
-                        success_count += 1
-                    except Exception as e:
-                        logger.warning(f'Failed to create avg/push for {jnt}: {e}')
-                        fail_count += 1
-                else:
-                    logger.debug(f'Joint does not exist: {jnt}')
-
-    logger.info(f'Batch complete: {success_count} succeeded, {fail_count} failed')
+    created = {}
+    failed = []
+    total_steps = 2 * len(target_joints)
+    done_steps = [0]
+
+    def report(jnt):
+        done_steps[0] += 1
+        if progress_callback is not None:
+            progress_callback(done_steps[0], total_steps, jnt)
+
+    def create(jnt, dag_path):
+        try:
+            created[jnt] = _createAvgPushJoints(dag_path, driver_joint=None, create_push=True)
+        except Exception as e:
+            logger.warning('Failed to create avg/push for %s: %s', jnt, e)
+            failed.append(jnt)
+        report(jnt)
+
+    def connect(jnt):
+        if jnt not in created:
+            report(jnt)
+            return
+        try:
+            _connectAvgPushJoints(created[jnt], weight=weight, driver_axis=driver_axis, distance_axis=distance_axis,
+                                  input_min=input_min, input_max=input_max,
+                                  output_min=output_min, output_max=output_max)
+            created_joints[jnt] = {'avg': created[jnt]['avg_joint'], 'push': created[jnt]['push_joint']}
+            logger.info('Created avg/push for %s', jnt)
+        except Exception as e:
+            logger.warning('Failed to create avg/push for %s: %s', jnt, e)
+            failed.append(jnt)
+        report(jnt)
+
+    # Create every avg/push joint first, then make all the connections. All of this stays on the main thread,
+    # Maya commands are not thread safe
+    batch = BatchProcessor()
+    for jnt, dag_path in target_joints:
+        batch.add(0, create, jnt, dag_path)
+        batch.add(1, connect, jnt)
+    batch.flush()
+
+    success_count = len(created_joints)
+    fail_count = len(failed)
+
+    logger.info('Batch complete: %s succeeded, %s failed', success_count, fail_count)
     return created_joints
@@ -56,6 +56,12 @@ def reload_modules():
         'jointBasedMuscle_template.muscle_ui'
     ]
 
+    # Close the open window first, reloading muscle_ui would otherwise leave it and its callbacks behind
+    for ui_module_name in ('jointBasedMuscle_template.muscle_ui', 'muscle_ui'):
+        ui_module = sys.modules.get(ui_module_name)
+        if ui_module is not None and hasattr(ui_module, 'close_muscle_ui'):
+            ui_module.close_muscle_ui()
+
     reloaded = []
     for module_name in modules_to_reload:
         try:
@@ -1,5 +1,6 @@
 import maya.api.OpenMaya as om
 import maya.cmds as mc
+import maya.mel as mel
 import logging
 
 from . import muscle_bone as mb
@@ -58,7 +59,7 @@ class BilateralMuscles:
         """
         Abstract method for performing final adjustments to the muscle setup.
         """
-        logger.info(f"Complete creating {self.name} muscle component on {self.side} side.")
+        logger.info("Complete creating %s muscle component on %s side.", self.name, self.side)
         for muscleJointGroup in self.muscleJointGroups.values():
             muscleJointGroup.update()
 
@@ -835,6 +836,12 @@ class UpperArmMuscles(BilateralMuscles):
     Create the deltoid muscle joint groups for a given side of the body.
     """
 
+    # the dummy driver network has a fixed topology (duplicate -> parent constraint -> tz connection),
+    # so it is built by a single MEL batch instead of one python command round trip per node
+    _DUMMY_DRIVER_MEL = ('string $muscleDummy[] = `duplicate -parentOnly -name "{dummy}" "{offset}"`;'
+                         'parentConstraint -maintainOffset -weight 1 "{driver}" $muscleDummy[0];'
+                         'connectAttr ($muscleDummy[0] + ".tz") "{offset}.tz";')
+
     def __init__(self, name='upperArmMuscles', side='Left',
                  upperArmTwistJoint=None, lowerArmTwistJoint=None,
                  scapulaJoint=None, inferiorAngleJoint=None):
@@ -929,31 +936,71 @@ class UpperArmMuscles(BilateralMuscles):
             mc.orientConstraint(twistValueJoint, basisOffsetJoint, self.bicep.muscleOrigin, mo=True, weight=1)[0]
         mc.setAttr('{0}.interpType'.format(orientConstraint), 2)
 
-        dummyNode = mc.duplicate(self.bicep.muscleOffset, name=self.bicep.muscleOffset + '_dummy',
-                                 parentOnly=True)[0]
         # outputNode = mc.duplicate(self.bicep.muscleOffset, name='outputNode', parentOnly=True)[0]
 
         # mc.parentConstraint(self.upperArmTwistJoint, twist2Joint, self.bicep.muscleOffset, mo=True, weight=1,
         #                     skipRotate=['x', 'y', 'z'],
         #                     skipTranslate=['x', 'y'])
-
-        mc.parentConstraint(self.upperArmJoint, dummyNode, mo=True, weight=1)
-        mc.connectAttr('{0}.tz'.format(dummyNode), '{0}.tz'.format(self.bicep.muscleOffset))
+        self._connectDummy(self.bicep)
 
         orientConstraint = \
             mc.orientConstraint(twistValueJoint, basisOffsetJoint, self.tricep.muscleOrigin, mo=True, weight=1)[0]
         mc.setAttr('{0}.interpType'.format(orientConstraint), 2)
 
-        dummyNode = mc.duplicate(self.tricep.muscleOffset, name=self.tricep.muscleOffset + '_dummy',
-                                 parentOnly=True)[0]
         # outputNode = mc.duplicate(self.tricep.muscleOffset, name='outputNode', parentOnly=True)[0]
 
         # mc.parentConstraint(self.upperArmTwistJoint, twist2Joint, self.tricep.muscleOffset, mo=True, weight=1,
         #                     skipRotate=['x', 'y', 'z'],
         #                     skipTranslate=['x', 'y'])
-
-        mc.parentConstraint(self.upperArmJoint, dummyNode, mo=True, weight=1)
-        mc.connectAttr('{0}.tz'.format(dummyNode), '{0}.tz'.format(self.tricep.muscleOffset))
+        self._connectDummy(self.tricep)
+
+    def _addFromBlueprint(self, muscleAttr, bpMuscle, originAttachObj, insertionAttachObj):
+        """
+        Create a muscle joint group from its blueprint data and register it on this instance.
+        :param muscleAttr: (str) The attribute the joint group is stored on ('bicep' or 'tricep').
+        :param bpMuscle: (dict) The blueprint data of the muscle: {"origin": ..., "insertion": ..., "center": ...}
+        :param originAttachObj: (str) The object the muscle origin is attached to.
+        :param insertionAttachObj: (str) The object the muscle insertion is attached to.
+        :return: (MuscleJointGroup) The created muscle joint group.
+        """
+        muscleJointGroup = mb.MuscleJointGroup.createFromBlueprint(bpOrigin=bpMuscle.get("origin"),
+                                                                   bpInsertion=bpMuscle.get("insertion"),
+                                                                   bpCenter=bpMuscle.get("center"),
+                                                                   originAttachObj=originAttachObj,
+                                                                   insertionAttachObj=insertionAttachObj,
+                                                                   compressionFactor=0.5,
+                                                                   stretchFactor=1.5)
+        setattr(self, muscleAttr, muscleJointGroup)
+        self.muscleJointGroups[muscleJointGroup.muscleName] = muscleJointGroup
+        return muscleJointGroup
+
+    def _connectDummy(self, muscleJointGroup):
+        """
+        Duplicate the muscle offset as a dummy node, parent constrain the dummy to the upper arm joint
+        and connect its translateZ to the muscle offset.
+        :param muscleJointGroup: (MuscleJointGroup) The bicep or tricep muscle joint group.
+        """
+        # maya nodes are never garbage collected: sweep dummies left behind by previous builds that no longer
+        # drive anything, otherwise they pile up in the scene and slow down every DG traversal
+        dummyNodes = mc.ls('{0}_dummy*'.format(muscleJointGroup.muscleOffset), type='joint')
+        staleDummies = [node for node in dummyNodes
+                        if not mc.listConnections('{0}.tz'.format(node), source=False, destination=True)]
+        if staleDummies:
+            mc.delete(staleDummies)
+
+        # a dummy that still drives the muscle offset is reused, editing its constraint instead of stacking a new one
+        liveDummies = [node for node in dummyNodes if node not in staleDummies]
+        if liveDummies:
+            existing = mc.listRelatives(liveDummies[0], type='parentConstraint') or []
+            if existing:
+                mc.parentConstraint(self.upperArmJoint, liveDummies[0], edit=True, weight=1)
+            else:
+                mc.parentConstraint(self.upperArmJoint, liveDummies[0], mo=True, weight=1)
+            return
+
+        mel.eval(self._DUMMY_DRIVER_MEL.format(dummy=muscleJointGroup.muscleOffset + '_dummy',
+                                               offset=muscleJointGroup.muscleOffset,
+                                               driver=self.upperArmJoint))
 
     @classmethod
     def build(cls, side, bpArmMuscles):
@@ -966,25 +1013,10 @@ class UpperArmMuscles(BilateralMuscles):
         :return: (UpperArmMuscles)  An instance of `UpperArmMuscles` with the bicep and tricep muscles.
         """
         armMuscles = cls(side=side)
-        bpBicep = armMuscles.ensureKeyExists(bpArmMuscles, "bicep")
-        armMuscles.bicep = mb.MuscleJointGroup.createFromBlueprint(bpOrigin=bpBicep.get("origin"),
-                                                                   bpInsertion=bpBicep.get("insertion"),
-                                                                   bpCenter=bpBicep.get("center"),
-                                                                   originAttachObj=armMuscles.upperArmTwistJoint,
-                                                                   insertionAttachObj=armMuscles.lowerArmTwistJoint,
-                                                                   compressionFactor=0.5,
-                                                                   stretchFactor=1.5)
-        armMuscles.muscleJointGroups[armMuscles.bicep.muscleName] = armMuscles.bicep
-
-        bpTricep = armMuscles.ensureKeyExists(bpArmMuscles, "tricep")
-        armMuscles.tricep = mb.MuscleJointGroup.createFromBlueprint(bpOrigin=bpTricep.get("origin"),
-                                                                    bpInsertion=bpTricep.get("insertion"),
-                                                                    bpCenter=bpTricep.get("center"),
-                                                                    originAttachObj=armMuscles.scapulaJoint,
-                                                                    insertionAttachObj=armMuscles.lowerArmJoint,
-                                                                    compressionFactor=0.5,
-                                                                    stretchFactor=1.5)
-        armMuscles.muscleJointGroups[armMuscles.tricep.muscleName] = armMuscles.tricep
+        armMuscles._addFromBlueprint('bicep', armMuscles.ensureKeyExists(bpArmMuscles, 'bicep'),
+                                     armMuscles.upperArmTwistJoint, armMuscles.lowerArmTwistJoint)
+        armMuscles._addFromBlueprint('tricep', armMuscles.ensureKeyExists(bpArmMuscles, 'tricep'),
+                                     armMuscles.scapulaJoint, armMuscles.lowerArmJoint)
 
         # armMuscles.finalize()
         return armMuscles
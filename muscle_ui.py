@@ -1,30 +1,330 @@
+import os
 import sys
+import contextlib
+import functools
 import maya.cmds as cmds
 import logging
 
 # Maya 2023 uses PySide2
 try:
     from PySide2.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
-                                   QHBoxLayout, QGridLayout, QPushButton, QLabel,
+                                   QGridLayout, QPushButton, QLabel,
                                    QComboBox, QGroupBox, QCheckBox, QSpinBox,
-                                   QDoubleSpinBox, QMessageBox, QScrollArea, QFileDialog)
-    from PySide2.QtCore import Qt, Signal
-    from PySide2.QtGui import QIcon, QPixmap, QFont
+                                   QDoubleSpinBox, QMessageBox, QScrollArea, QFileDialog,
+                                   QProgressDialog)
+    from PySide2.QtCore import Qt, Slot
+    from shiboken2 import wrapInstance, isValid
     PYSIDE2_AVAILABLE = True
 except ImportError:
     PYSIDE2_AVAILABLE = False
     raise ImportError("PySide2 not found. Maya 2023 requires PySide2 to be available.")
 
-from . import muscle_template as mt
-from . import utils
-from . import helper_bone
-from . import avg_push_joint
-from .rollBone import rollBone
 import maya.api.OpenMaya as om
+import maya.OpenMayaUI as omui
 
 logger = logging.getLogger(__name__)
 
 
+# The muscle and joint tool modules are only imported when one of their buttons is first used
+@functools.lru_cache(1)
+def _muscle_template():
+    from . import muscle_template
+    return muscle_template
+
+
+@functools.lru_cache(1)
+def _utils():
+    from . import utils
+    return utils
+
+
+@functools.lru_cache(1)
+def _avg_push():
+    from . import avg_push_joint
+    return avg_push_joint
+
+
+@functools.lru_cache(1)
+def _helper_bone():
+    from . import helper_bone
+    return helper_bone
+
+
+@functools.lru_cache(1)
+def _roll_bone():
+    from . import rollBone
+    return rollBone
+
+
+# milliseconds a success message stays in the status bar
+_STATUS_MESSAGE_TIMEOUT = 3000
+
+# Maya's main window wrapped as a QWidget, resolved on first use by _get_maya_main_window
+_maya_main_window = None
+# the MuscleRigUI window, kept alive between show_muscle_ui calls
+_UI_INSTANCE = None
+
+# (key, title) of the group boxes in the muscle scroll area, in display order
+_MUSCLE_GROUPS = (
+    ("torso", "Torso Muscles"),
+    ("shoulder", "Shoulder Muscles"),
+    ("arm", "Arm Muscles"),
+    ("helper", "Helper Bones"),
+    ("twist", "Twist Joints"),
+    ("avg_push", "Average & Push Joints"),
+    ("batch", "Batch Creation"),
+)
+# secondary groups whose contents are only built the first time they are expanded,
+# the core muscle groups are always built and shown
+_LAZY_GROUPS = ("batch",)
+
+# (role, background color) of the colored buttons. A button picks its color through its "role" dynamic property,
+# matched by one QPushButton[role="..."] rule of the window stylesheet
+_BUTTON_ROLES = (
+    ("green", "#4CAF50"),
+    ("blue", "#2196F3"),
+    ("orange", "#FF9800"),
+    ("purple", "#9C27B0"),
+    ("red", "#F44336"),
+    ("blue_grey", "#607D8B"),
+    ("cyan", "#00BCD4"),
+    ("teal", "#009688"),
+    ("indigo", "#3F51B5"),
+    ("deep_purple", "#673AB7"),
+    ("deep_orange", "#FF5722"),
+    ("pink", "#E91E63"),
+    ("brown", "#795548"),
+)
+
+# (group, attribute, label, role, row, column, row span, column span, minimum height)
+_BUTTON_SPECS = (
+    ("torso", "trapezius_btn", "Trapezius", "green", 0, 0, 1, 1, 40),
+    ("torso", "latissimus_btn", "Latissimus Dorsi", "blue", 0, 1, 1, 1, 40),
+    ("torso", "teres_major_btn", "Teres Major", "orange", 1, 0, 1, 1, 40),
+    ("torso", "pectoralis_btn", "Pectoralis Major", "purple", 1, 1, 1, 1, 40),
+    ("shoulder", "deltoid_btn", "Deltoid", "red", 0, 0, 1, 1, 40),
+    ("arm", "upper_arm_btn", "Upper Arm (Bicep/Tricep)", "blue_grey", 0, 0, 1, 1, 40),
+    ("helper", "scapula_btn", "Add Scapula Joints", "cyan", 0, 0, 1, 1, 40),
+    ("helper", "mirror_scapula_btn", "Mirror Scapula Joints", "teal", 0, 1, 1, 1, 40),
+    ("twist", "twist_joint_btn", "Setup Twist Joint Chain", "indigo", 0, 0, 1, 1, 40),
+    ("twist", "counter_twist_btn", "Setup Counter Twist Chain", "deep_purple", 0, 1, 1, 1, 40),
+    ("twist", "non_flip_twist_btn", "Setup Non-Flip Twist Chain", "purple", 1, 0, 1, 2, 40),
+    ("avg_push", "create_avg_push_btn", "Create Average and Push Joints", "deep_orange", 0, 0, 1, 4, 45),
+    ("avg_push", "batch_all_avg_push_btn", "Fingers Average and Push Joints", "pink", 1, 0, 1, 4, 45),
+    ("batch", "create_all_btn", "Create All Muscles", "brown", 0, 0, 1, 2, 50),
+    ("batch", "create_torso_btn", "Create Torso Only", None, 1, 0, 1, 1, 40),
+    ("batch", "create_arms_btn", "Create Arms Only", None, 1, 1, 1, 1, 40),
+    ("control", "finalize_btn", "Finalize All", "green", 0, 0, 1, 1, 35),
+    ("control", "delete_all_btn", "Delete All", "red", 0, 1, 1, 1, 35),
+    ("control", "refresh_btn", "Refresh", None, 0, 2, 1, 1, 35),
+    ("io", "export_btn", "Export to JSON", "orange", 0, 0, 1, 1, 35),
+    ("io", "import_btn", "Import from JSON", "blue", 0, 1, 1, 1, 35),
+)
+# button attribute -> name of the MuscleRigUI slot its clicked signal is connected to. The single muscle buttons
+# are not listed, they all share _on_muscle_button
+_BUTTON_SLOTS = {
+    "scapula_btn": "add_scapula_joints",
+    "mirror_scapula_btn": "mirror_scapula_joints",
+    "twist_joint_btn": "setup_twist_joint_chain",
+    "counter_twist_btn": "setup_counter_twist_chain",
+    "non_flip_twist_btn": "setup_non_flip_twist",
+    "create_avg_push_btn": "create_avg_push_from_selection",
+    "batch_all_avg_push_btn": "batch_create_all_avg_push",
+    "create_all_btn": "create_all_muscles",
+    "create_torso_btn": "create_torso_muscles",
+    "create_arms_btn": "create_arm_muscles",
+    "finalize_btn": "finalize_all_muscles",
+    "delete_all_btn": "delete_all_muscles",
+    "refresh_btn": "refresh_ui",
+    "export_btn": "export_muscles",
+    "import_btn": "import_muscles",
+}
+
+# (label, vector) of the twist/up axis combo box items, in combo box index order
+_AXIS_ITEMS = (
+    ("X (1,0,0)", (1, 0, 0)),
+    ("Y (0,1,0)", (0, 1, 0)),
+    ("Z (0,0,1)", (0, 0, 1)),
+    ("-X (-1,0,0)", (-1, 0, 0)),
+    ("-Y (0,-1,0)", (0, -1, 0)),
+    ("-Z (0,0,-1)", (0, 0, -1)),
+)
+_AXIS_VECTORS = tuple(axis for _, axis in _AXIS_ITEMS)
+# the same axes as MVectors, for the rollBone functions that take an MVector up axis. Shared, don't modify them
+_UP_VECTORS = tuple(om.MVector(*axis) for axis in _AXIS_VECTORS)
+
+# (attribute, label, minimum, maximum, value, single step, row, column) of the labeled double spin boxes,
+# the label goes in the given column and the spin box in the next one
+_OPTION_SPIN_SPECS = (
+    ("compression_spin", "Compression:", 0.1, 2.0, 0.5, 0.1, 1, 0),
+    ("stretch_spin", "Stretch:", 0.1, 3.0, 1.5, 0.1, 1, 2),
+)
+_AVG_PUSH_SPIN_SPECS = (
+    ("avg_weight_spin", "Avg Weight:", 0.0, 1.0, 0.5, 0.1, 2, 0),
+    ("push_scale_value_spin", "Scale Value:", 0, 2, 0.2, 0.1, 3, 2),
+    ("remap_input_min_spin", "Input Min:", -360, 360, 0.0, 1.0, 5, 0),
+    ("remap_input_max_spin", "Input Max:", -360, 360, 90.0, 1.0, 5, 2),
+    ("remap_output_min_spin", "Output Min:", -100, 100, 0.0, 0.1, 6, 0),
+    ("remap_output_max_spin", "Output Max:", -100, 100, 5.0, 0.1, 6, 2),
+)
+# (button attribute, MFn type, minimum count, maximum count, tooltip) of the buttons that act on the selection,
+# they are only enabled while the selection matches
+_SELECTION_BUTTONS = (
+    ("scapula_btn", om.MFn.kTransform, 3, 3,
+     "Select 3 locators: acromion, scapula root, scapula tip"),
+    ("twist_joint_btn", om.MFn.kJoint, 2, 2, "Select 2 joints: start joint, end joint"),
+    ("counter_twist_btn", om.MFn.kJoint, 2, 2, "Select 2 joints: start joint, end joint"),
+    ("non_flip_twist_btn", om.MFn.kJoint, 3, 3, "Select 3 joints: start joint, end joint, up joint"),
+    ("create_avg_push_btn", om.MFn.kJoint, 1, 2,
+     "Select 1 or 2 joints: target joint, driver joint (optional, parent if not selected)"),
+)
+# (params key, widget attribute) of the Average & Push settings cached in MuscleRigUI._params
+_AVG_PUSH_PARAM_SPINS = (
+    ("weight", "avg_weight_spin"),
+    ("scale_value", "push_scale_value_spin"),
+    ("input_min", "remap_input_min_spin"),
+    ("input_max", "remap_input_max_spin"),
+    ("output_min", "remap_output_min_spin"),
+    ("output_max", "remap_output_max_spin"),
+)
+_AVG_PUSH_PARAM_COMBOS = (
+    ("twist_axis", "avg_twist_axis_combo"),
+    ("push_axis", "avg_push_axis_combo"),
+)
+
+# window stylesheet, built once at import time and shared by every window. It includes one rule per button
+# role, so the whole window is styled by a single stylesheet parse
+_MAYA_STYLE = """
+    QMainWindow, QWidget#central_widget {
+        background-color: #393939;
+        color: #CCCCCC;
+    }
+    QGroupBox {
+        font-weight: bold;
+        border: 1px solid #555555;
+        border-radius: 5px;
+        margin-top: 10px;
+        padding-top: 5px;
+        background-color: #424242;
+        color: #FFFFFF;
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        left: 10px;
+        padding: 0 5px 0 5px;
+    }
+    QLabel {
+        color: #CCCCCC;
+    }
+    QLabel#title_label {
+        font-size: 16px;
+        font-weight: bold;
+        padding: 10px;
+    }
+    QLabel#remap_label {
+        font-weight: bold;
+        color: #FFD700;
+        margin-top: 5px;
+    }
+    QComboBox {
+        background-color: #555555;
+        border: 1px solid #777777;
+        border-radius: 3px;
+        padding: 2px;
+        color: #FFFFFF;
+    }
+    QComboBox::drop-down {
+        subcontrol-origin: padding;
+        subcontrol-position: top right;
+        width: 15px;
+        border-left-width: 1px;
+        border-left-color: #777777;
+        border-left-style: solid;
+    }
+    QCheckBox {
+        color: #CCCCCC;
+    }
+    QSpinBox, QDoubleSpinBox {
+        background-color: #555555;
+        border: 1px solid #777777;
+        border-radius: 3px;
+        padding: 2px;
+        color: #FFFFFF;
+    }
+    QPushButton#create_all_btn {
+        font-size: 14px;
+    }
+    QPushButton#finalize_btn, QPushButton#delete_all_btn, QPushButton#export_btn, QPushButton#import_btn {
+        font-weight: normal;
+    }
+""" + "".join(
+    "QPushButton[role=\"{0}\"] {{ background-color: {1}; color: white; font-weight: bold; }}\n".format(role, color)
+    for role, color in _BUTTON_ROLES)
+
+
+# (button attribute, muscle type) of the buttons creating a single muscle component
+_MUSCLE_BUTTONS = (
+    ("trapezius_btn", "Trapezius"),
+    ("latissimus_btn", "LatissimusDorsi"),
+    ("teres_major_btn", "TerasMajor"),
+    ("pectoralis_btn", "PectoralisMajor"),
+    ("deltoid_btn", "Deltoid"),
+    ("upper_arm_btn", "UpperArm"),
+)
+_MUSCLE_BUTTON_TYPES = dict(_MUSCLE_BUTTONS)
+
+
+# muscle type -> name of the muscle component class in muscle_template
+_MUSCLE_CLASSES = {
+    "Trapezius": "TrapeziusMuscles",
+    "LatissimusDorsi": "LatissimusDorsiMuscles",
+    "TerasMajor": "TerasMajorMuscles",
+    "PectoralisMajor": "PectoralisMajorMuscles",
+    "Deltoid": "DeltoidMuscles",
+    "UpperArm": "UpperArmMuscles"
+}
+
+
+def _set_button_role(button, role):
+    """Set the style role of a button, re-polishing it when it is already shown so the new rule applies"""
+    button.setProperty("role", role)
+    if button.isVisible():
+        button.style().unpolish(button)
+        button.style().polish(button)
+
+
+def _single_flight(method):
+    """
+    Run a batch handler only if no other batch is running, with the clicked button disabled meanwhile,
+    so repeated clicks don't start overlapping batches and undo chunks.
+    The wrapper takes no arguments so PySide doesn't pass the clicked(bool) checked state through.
+    """
+    @functools.wraps(method)
+    def wrapper(self):
+        if self._batch_inflight:
+            logger.info("%s ignored, a batch is already running", method.__name__)
+            return None
+        button = self.sender()
+        if not isinstance(button, QPushButton):
+            button = None
+        self._batch_inflight = True
+        if button is not None:
+            button.setEnabled(False)
+        try:
+            return method(self)
+        finally:
+            self._batch_inflight = False
+            if button is not None:
+                button.setEnabled(True)
+    return wrapper
+
+
+# muscle types created by the batch creation buttons, in _MUSCLE_CLASSES order
+_ALL_MUSCLES = tuple(_MUSCLE_CLASSES)
+_TORSO_MUSCLES = _ALL_MUSCLES[:4]
+_ARM_MUSCLES = _ALL_MUSCLES[4:]
+
+
 class MuscleRigUI(QMainWindow):
     """
     A comprehensive UI for creating and managing the joint-based muscle rig system.
@@ -39,10 +339,23 @@ class MuscleRigUI(QMainWindow):
 
         # Maya 2023 specific window settings
         self.setWindowFlags(Qt.Window | Qt.WindowCloseButtonHint | Qt.WindowMinimizeButtonHint)
-        self.setAttribute(Qt.WA_DeleteOnClose, True)
+        # closing only hides the window, show_muscle_ui reuses it
+        self.setAttribute(Qt.WA_DeleteOnClose, False)
 
         # Store created muscle instances
         self.created_muscles = {}
+        # MObjectHandles of the muscle origins of each created muscle, to check if it still exists in the scene
+        self._muscle_handles = {}
+        # (layout, build function) of the lazy sections not built yet, by section object name
+        self._lazy_sections = {}
+        # directory of the last exported/imported file, the file dialogs start there
+        self._last_io_dir = ""
+        # answer to "replace existing muscle?" remembered for the current batch: None, "yes-all" or "no-all"
+        self._replace_policy = None
+        # True while a batch handler runs, see _single_flight
+        self._batch_inflight = False
+        # Average & Push settings, kept up to date by the widgets' change signals so the handlers don't query them
+        self._params = {}
 
         # Apply Maya-style theme
         self.apply_maya_styling()
@@ -50,62 +363,26 @@ class MuscleRigUI(QMainWindow):
         # Setup UI
         self.setup_ui()
         self.connect_signals()
+        # success messages go to the status bar
+        self.statusBar()
+
+        # The active selection list and its filtered nodes, {MFn type: (MDagPaths, names)}, are only queried again
+        # after the selection changed, the callback is registered while the window is shown
+        self._cached_selection = None
+        self._selection_by_type = {}
+        self._selection_callback_id = None
 
     def apply_maya_styling(self):
         """Apply Maya 2023 compatible styling"""
-        maya_style = """
-            QMainWindow {
-                background-color: #393939;
-                color: #CCCCCC;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 1px solid #555555;
-                border-radius: 5px;
-                margin-top: 10px;
-                padding-top: 5px;
-                background-color: #424242;
-                color: #FFFFFF;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-            }
-            QLabel {
-                color: #CCCCCC;
-            }
-            QComboBox {
-                background-color: #555555;
-                border: 1px solid #777777;
-                border-radius: 3px;
-                padding: 2px;
-                color: #FFFFFF;
-            }
-            QComboBox::drop-down {
-                subcontrol-origin: padding;
-                subcontrol-position: top right;
-                width: 15px;
-                border-left-width: 1px;
-                border-left-color: #777777;
-                border-left-style: solid;
-            }
-            QCheckBox {
-                color: #CCCCCC;
-            }
-            QSpinBox, QDoubleSpinBox {
-                background-color: #555555;
-                border: 1px solid #777777;
-                border-radius: 3px;
-                padding: 2px;
-                color: #FFFFFF;
-            }
-        """
-        self.setStyleSheet(maya_style)
+        self.setStyleSheet(_MAYA_STYLE)
 
     def setup_ui(self):
         """Setup the main UI layout and widgets"""
         central_widget = QWidget()
+        central_widget.setObjectName("central_widget")
+        central_widget.setAttribute(Qt.WA_StyledBackground, True)
+        # no paint or layout passes while the widgets are added, everything is laid out once at the end
+        central_widget.setUpdatesEnabled(False)
         self.setCentralWidget(central_widget)
 
         # Main layout
@@ -116,30 +393,36 @@ class MuscleRigUI(QMainWindow):
         # Title
         title_label = QLabel("Joint-Based Muscle Rig System")
         title_label.setAlignment(Qt.AlignCenter)
-        title_label.setStyleSheet("font-size: 16px; font-weight: bold; padding: 10px;")
+        title_label.setObjectName("title_label")
         main_layout.addWidget(title_label)
 
         # Options section
         self.setup_options_section(main_layout)
 
         # Scroll area for muscle buttons
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
         scroll_widget = QWidget()
         scroll_layout = QVBoxLayout(scroll_widget)
 
         # Muscle groups
+        scroll_widget.setUpdatesEnabled(False)
         self.setup_muscle_groups(scroll_layout)
+        scroll_widget.setUpdatesEnabled(True)
 
-        scroll_area.setWidget(scroll_widget)
-        main_layout.addWidget(scroll_area)
+        self.scroll_area.setWidget(scroll_widget)
+        main_layout.addWidget(self.scroll_area)
 
         # Control buttons
         self.setup_control_buttons(main_layout)
 
+        central_widget.setUpdatesEnabled(True)
+        central_widget.updateGeometry()
+
     def setup_options_section(self, parent_layout):
         """Setup the options and settings section"""
         options_group = QGroupBox("Options")
+        options_group.setObjectName("options_group")
         options_layout = QGridLayout(options_group)
 
         # Side selection
@@ -154,33 +437,20 @@ class MuscleRigUI(QMainWindow):
         self.auto_mirror_check.setChecked(True)
         options_layout.addWidget(self.auto_mirror_check, 0, 2)
 
-        # Compression factor
-        options_layout.addWidget(QLabel("Compression:"), 1, 0)
-        self.compression_spin = QDoubleSpinBox()
-        self.compression_spin.setRange(0.1, 2.0)
-        self.compression_spin.setValue(0.5)
-        self.compression_spin.setSingleStep(0.1)
-        options_layout.addWidget(self.compression_spin, 1, 1)
-
-        # Stretch factor
-        options_layout.addWidget(QLabel("Stretch:"), 1, 2)
-        self.stretch_spin = QDoubleSpinBox()
-        self.stretch_spin.setRange(0.1, 3.0)
-        self.stretch_spin.setValue(1.5)
-        self.stretch_spin.setSingleStep(0.1)
-        options_layout.addWidget(self.stretch_spin, 1, 3)
+        # Compression and stretch factors
+        self._add_double_spins(options_layout, _OPTION_SPIN_SPECS)
 
         # Twist Axis selection
         options_layout.addWidget(QLabel("Twist Axis:"), 2, 0)
         self.twist_axis_combo = QComboBox()
-        self.twist_axis_combo.addItems(["X (1,0,0)", "Y (0,1,0)", "Z (0,0,1)", "-X (-1,0,0)", "-Y (0,-1,0)", "-Z (0,0,-1)"])
+        self.twist_axis_combo.addItems([label for label, _ in _AXIS_ITEMS])
         self.twist_axis_combo.setCurrentText("Y (0,1,0)")
         options_layout.addWidget(self.twist_axis_combo, 2, 1)
 
         # Up Axis selection
         options_layout.addWidget(QLabel("Up Axis:"), 2, 2)
         self.up_axis_combo = QComboBox()
-        self.up_axis_combo.addItems(["X (1,0,0)", "Y (0,1,0)", "Z (0,0,1)", "-X (-1,0,0)", "-Y (0,-1,0)", "-Z (0,0,-1)"])
+        self.up_axis_combo.addItems([label for label, _ in _AXIS_ITEMS])
         self.up_axis_combo.setCurrentText("X (1,0,0)")
         options_layout.addWidget(self.up_axis_combo, 2, 3)
 
@@ -188,422 +458,389 @@ class MuscleRigUI(QMainWindow):
 
     def setup_muscle_groups(self, parent_layout):
         """Setup muscle group buttons organized by body region"""
-
-        # Torso muscles
-        torso_group = QGroupBox("Torso Muscles")
-        torso_layout = QGridLayout(torso_group)
-
-        self.trapezius_btn = QPushButton("Trapezius")
-        self.trapezius_btn.setMinimumHeight(40)
-        self.trapezius_btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; font-weight: bold; }")
-        torso_layout.addWidget(self.trapezius_btn, 0, 0)
-
-        self.latissimus_btn = QPushButton("Latissimus Dorsi")
-        self.latissimus_btn.setMinimumHeight(40)
-        self.latissimus_btn.setStyleSheet("QPushButton { background-color: #2196F3; color: white; font-weight: bold; }")
-        torso_layout.addWidget(self.latissimus_btn, 0, 1)
-
-        self.teres_major_btn = QPushButton("Teres Major")
-        self.teres_major_btn.setMinimumHeight(40)
-        self.teres_major_btn.setStyleSheet("QPushButton { background-color: #FF9800; color: white; font-weight: bold; }")
-        torso_layout.addWidget(self.teres_major_btn, 1, 0)
-
-        self.pectoralis_btn = QPushButton("Pectoralis Major")
-        self.pectoralis_btn.setMinimumHeight(40)
-        self.pectoralis_btn.setStyleSheet("QPushButton { background-color: #9C27B0; color: white; font-weight: bold; }")
-        torso_layout.addWidget(self.pectoralis_btn, 1, 1)
-
-        parent_layout.addWidget(torso_group)
-
-        # Shoulder muscles
-        shoulder_group = QGroupBox("Shoulder Muscles")
-        shoulder_layout = QGridLayout(shoulder_group)
-
-        self.deltoid_btn = QPushButton("Deltoid")
-        self.deltoid_btn.setMinimumHeight(40)
-        self.deltoid_btn.setStyleSheet("QPushButton { background-color: #F44336; color: white; font-weight: bold; }")
-        shoulder_layout.addWidget(self.deltoid_btn, 0, 0)
-
-        parent_layout.addWidget(shoulder_group)
-
-        # Arm muscles
-        arm_group = QGroupBox("Arm Muscles")
-        arm_layout = QGridLayout(arm_group)
-
-        self.upper_arm_btn = QPushButton("Upper Arm (Bicep/Tricep)")
-        self.upper_arm_btn.setMinimumHeight(40)
-        self.upper_arm_btn.setStyleSheet("QPushButton { background-color: #607D8B; color: white; font-weight: bold; }")
-        arm_layout.addWidget(self.upper_arm_btn, 0, 0)
-
-        parent_layout.addWidget(arm_group)
-
-        # Helper Bones section
-        helper_group = QGroupBox("Helper Bones")
-        helper_layout = QGridLayout(helper_group)
-
-        self.scapula_btn = QPushButton("Add Scapula Joints")
-        self.scapula_btn.setMinimumHeight(40)
-        self.scapula_btn.setStyleSheet("QPushButton { background-color: #00BCD4; color: white; font-weight: bold; }")
-        helper_layout.addWidget(self.scapula_btn, 0, 0)
-
-        self.mirror_scapula_btn = QPushButton("Mirror Scapula Joints")
-        self.mirror_scapula_btn.setMinimumHeight(40)
-        self.mirror_scapula_btn.setStyleSheet("QPushButton { background-color: #009688; color: white; font-weight: bold; }")
-        helper_layout.addWidget(self.mirror_scapula_btn, 0, 1)
-
-        parent_layout.addWidget(helper_group)
-
-        # Twist Joint section
-        twist_group = QGroupBox("Twist Joints")
-        twist_layout = QGridLayout(twist_group)
-
-        self.twist_joint_btn = QPushButton("Setup Twist Joint Chain")
-        self.twist_joint_btn.setMinimumHeight(40)
-        self.twist_joint_btn.setStyleSheet("QPushButton { background-color: #3F51B5; color: white; font-weight: bold; }")
-        twist_layout.addWidget(self.twist_joint_btn, 0, 0)
-
-        self.counter_twist_btn = QPushButton("Setup Counter Twist Chain")
-        self.counter_twist_btn.setMinimumHeight(40)
-        self.counter_twist_btn.setStyleSheet("QPushButton { background-color: #673AB7; color: white; font-weight: bold; }")
-        twist_layout.addWidget(self.counter_twist_btn, 0, 1)
-
-        self.non_flip_twist_btn = QPushButton("Setup Non-Flip Twist Chain")
-        self.non_flip_twist_btn.setMinimumHeight(40)
-        self.non_flip_twist_btn.setStyleSheet("QPushButton { background-color: #9C27B0; color: white; font-weight: bold; }")
-        twist_layout.addWidget(self.non_flip_twist_btn, 1, 0, 1, 2)
+        group_layouts = {}
+        for key, title in _MUSCLE_GROUPS:
+            if key in _LAZY_GROUPS:
+                self._add_lazy_section(parent_layout, f"{key}_group", title, QGridLayout,
+                                       functools.partial(self._add_spec_buttons, key))
+                continue
+            group = QGroupBox(title)
+            group.setObjectName(f"{key}_group")
+            group_layouts[key] = QGridLayout(group)
+            self._add_spec_buttons(key, group_layouts[key])
+            parent_layout.addWidget(group)
 
         # Twist joint count control
+        twist_layout = group_layouts["twist"]
         twist_layout.addWidget(QLabel("Twist Joint Count:"), 2, 0)
         self.twist_count_spin = QSpinBox()
         self.twist_count_spin.setRange(1, 10)
         self.twist_count_spin.setValue(3)
         twist_layout.addWidget(self.twist_count_spin, 2, 1)
 
-        parent_layout.addWidget(twist_group)
-
-        # Average & Push Joints section
-        avg_push_group = QGroupBox("Average & Push Joints")
-        avg_push_layout = QGridLayout(avg_push_group)
-
-        # Buttons spanning full width
-        self.create_avg_push_btn = QPushButton("Create Average and Push Joints")
-        self.create_avg_push_btn.setMinimumHeight(45)
-        self.create_avg_push_btn.setStyleSheet("QPushButton { background-color: #FF5722; color: white; font-weight: bold; }")
-        avg_push_layout.addWidget(self.create_avg_push_btn, 0, 0, 1, 4)
-
-        self.batch_all_avg_push_btn = QPushButton("Fingers Average and Push Joints")
-        self.batch_all_avg_push_btn.setMinimumHeight(45)
-        self.batch_all_avg_push_btn.setStyleSheet("QPushButton { background-color: #E91E63; color: white; font-weight: bold; }")
-        avg_push_layout.addWidget(self.batch_all_avg_push_btn, 1, 0, 1, 4)
-
-        # Two-column layout for parameters
-        # Left column - Basic parameters
-        row = 2
-        avg_push_layout.addWidget(QLabel("Avg Weight:"), row, 0)
-        self.avg_weight_spin = QDoubleSpinBox()
-        self.avg_weight_spin.setRange(0.0, 1.0)
-        self.avg_weight_spin.setValue(0.5)
-        self.avg_weight_spin.setSingleStep(0.1)
-        avg_push_layout.addWidget(self.avg_weight_spin, row, 1)
+        # Average & Push Joints parameters
+        avg_push_layout = group_layouts["avg_push"]
+
+        # Two-column layout for parameters, the combo boxes fill the remaining cells
+        self._add_double_spins(avg_push_layout, _AVG_PUSH_SPIN_SPECS)
 
         # Right column - Twist Axis
-        avg_push_layout.addWidget(QLabel("Twist Axis:"), row, 2)
+        avg_push_layout.addWidget(QLabel("Twist Axis:"), 2, 2)
         self.avg_twist_axis_combo = QComboBox()
         self.avg_twist_axis_combo.addItems(["X", "Y", "Z"])
         self.avg_twist_axis_combo.setCurrentText("Z")
-        avg_push_layout.addWidget(self.avg_twist_axis_combo, row, 3)
+        avg_push_layout.addWidget(self.avg_twist_axis_combo, 2, 3)
 
         # Left column - Push Axis
-        row += 1
-        avg_push_layout.addWidget(QLabel("Push Axis:"), row, 0)
+        avg_push_layout.addWidget(QLabel("Push Axis:"), 3, 0)
         self.avg_push_axis_combo = QComboBox()
         self.avg_push_axis_combo.addItems(["X", "Y", "Z"])
         self.avg_push_axis_combo.setCurrentText("Y")
-        avg_push_layout.addWidget(self.avg_push_axis_combo, row, 1)
-
-        # Right column - Scale Value
-        avg_push_layout.addWidget(QLabel("Scale Value:"), row, 2)
-        self.push_scale_value_spin = QDoubleSpinBox()
-        self.push_scale_value_spin.setRange(0, 2)
-        self.push_scale_value_spin.setValue(0.2)
-        self.push_scale_value_spin.setSingleStep(0.1)
-        avg_push_layout.addWidget(self.push_scale_value_spin, row, 3)
+        avg_push_layout.addWidget(self.avg_push_axis_combo, 3, 1)
 
         # RemapValue parameters section
-        row += 1
         remap_label = QLabel("Remap Value Settings")
-        remap_label.setStyleSheet("font-weight: bold; color: #FFD700; margin-top: 5px;")
-        avg_push_layout.addWidget(remap_label, row, 0, 1, 4)
-
-        # Left column - Input Min
-        row += 1
-        avg_push_layout.addWidget(QLabel("Input Min:"), row, 0)
-        self.remap_input_min_spin = QDoubleSpinBox()
-        self.remap_input_min_spin.setRange(-360, 360)
-        self.remap_input_min_spin.setValue(0.0)
-        self.remap_input_min_spin.setSingleStep(1.0)
-        avg_push_layout.addWidget(self.remap_input_min_spin, row, 1)
-
-        # Right column - Input Max
-        avg_push_layout.addWidget(QLabel("Input Max:"), row, 2)
-        self.remap_input_max_spin = QDoubleSpinBox()
-        self.remap_input_max_spin.setRange(-360, 360)
-        self.remap_input_max_spin.setValue(90.0)
-        self.remap_input_max_spin.setSingleStep(1.0)
-        avg_push_layout.addWidget(self.remap_input_max_spin, row, 3)
-
-        # Left column - Output Min
-        row += 1
-        avg_push_layout.addWidget(QLabel("Output Min:"), row, 0)
-        self.remap_output_min_spin = QDoubleSpinBox()
-        self.remap_output_min_spin.setRange(-100, 100)
-        self.remap_output_min_spin.setValue(0.0)
-        self.remap_output_min_spin.setSingleStep(0.1)
-        avg_push_layout.addWidget(self.remap_output_min_spin, row, 1)
-
-        # Right column - Output Max
-        avg_push_layout.addWidget(QLabel("Output Max:"), row, 2)
-        self.remap_output_max_spin = QDoubleSpinBox()
-        self.remap_output_max_spin.setRange(-100, 100)
-        self.remap_output_max_spin.setValue(5.0)
-        self.remap_output_max_spin.setSingleStep(0.1)
-        avg_push_layout.addWidget(self.remap_output_max_spin, row, 3)
-
-        parent_layout.addWidget(avg_push_group)
-
-        # Combined options
-        combined_group = QGroupBox("Batch Creation")
-        combined_layout = QGridLayout(combined_group)
-
-        self.create_all_btn = QPushButton("Create All Muscles")
-        self.create_all_btn.setMinimumHeight(50)
-        self.create_all_btn.setStyleSheet("QPushButton { background-color: #795548; color: white; font-weight: bold; font-size: 14px; }")
-        combined_layout.addWidget(self.create_all_btn, 0, 0, 1, 2)
-
-        self.create_torso_btn = QPushButton("Create Torso Only")
-        self.create_torso_btn.setMinimumHeight(40)
-        combined_layout.addWidget(self.create_torso_btn, 1, 0)
-
-        self.create_arms_btn = QPushButton("Create Arms Only")
-        self.create_arms_btn.setMinimumHeight(40)
-        combined_layout.addWidget(self.create_arms_btn, 1, 1)
-
-        parent_layout.addWidget(combined_group)
+        remap_label.setObjectName("remap_label")
+        avg_push_layout.addWidget(remap_label, 4, 0, 1, 4)
+
+    def _add_double_spins(self, layout, spin_specs):
+        """Create labeled QDoubleSpinBoxes from a spin spec table"""
+        for attr, label, minimum, maximum, value, step, row, col in spin_specs:
+            spin = QDoubleSpinBox()
+            spin.setRange(minimum, maximum)
+            spin.setValue(value)
+            spin.setSingleStep(step)
+            setattr(self, attr, spin)
+            layout.addWidget(QLabel(label), row, col)
+            layout.addWidget(spin, row, col + 1)
+
+    def _add_spec_buttons(self, group_key, layout):
+        """Create the buttons of a group from _BUTTON_SPECS and connect them"""
+        for spec_group_key, attr, label, role, row, col, row_span, col_span, height in _BUTTON_SPECS:
+            if spec_group_key != group_key:
+                continue
+            btn = QPushButton(label)
+            btn.setObjectName(attr)
+            btn.setMinimumHeight(height)
+            if role:
+                _set_button_role(btn, role)
+            setattr(self, attr, btn)
+            layout.addWidget(btn, row, col, row_span, col_span)
+
+            if attr in _MUSCLE_BUTTON_TYPES:
+                # the muscle type travels on the button, so they all share one slot
+                btn.setProperty("muscleType", _MUSCLE_BUTTON_TYPES[attr])
+                btn.clicked.connect(self._on_muscle_button)
+            else:
+                btn.clicked.connect(getattr(self, _BUTTON_SLOTS[attr]))
+
+    def _add_lazy_section(self, parent_layout, name, title, layout_class, build_contents):
+        """
+        Add a collapsed section whose contents are built by build_contents(layout) the first time it is expanded,
+        so opening the window only constructs the widgets that are visible.
+        """
+        group = QGroupBox(title)
+        group.setObjectName(name)
+        group.setCheckable(True)
+        group.setChecked(False)
+        layout = layout_class(group)
+
+        self._lazy_sections[name] = (layout, build_contents)
+        group.toggled.connect(self._on_lazy_section_toggled)
+        parent_layout.addWidget(group)
+        return group
+
+    @Slot(bool)
+    def _on_lazy_section_toggled(self, checked):
+        """Build the toggled section's contents if it is expanded for the first time, and show or hide them"""
+        group = self.sender()
+        # the section is laid out and repainted once, after its contents are built and shown
+        group.setUpdatesEnabled(False)
+        try:
+            if checked and group.objectName() in self._lazy_sections:
+                layout, build_contents = self._lazy_sections.pop(group.objectName())
+                build_contents(layout)
+            # direct child widgets only, findChildren has no options argument in PySide2
+            for child in group.children():
+                if child.isWidgetType():
+                    child.setVisible(checked)
+        finally:
+            group.setUpdatesEnabled(True)
 
     def setup_control_buttons(self, parent_layout):
         """Setup control buttons for managing created muscles"""
-        control_group = QGroupBox("Control")
-        control_layout = QHBoxLayout(control_group)
-
-        self.finalize_btn = QPushButton("Finalize All")
-        self.finalize_btn.setMinimumHeight(35)
-        self.finalize_btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; }")
-        control_layout.addWidget(self.finalize_btn)
-
-        self.delete_all_btn = QPushButton("Delete All")
-        self.delete_all_btn.setMinimumHeight(35)
-        self.delete_all_btn.setStyleSheet("QPushButton { background-color: #F44336; color: white; }")
-        control_layout.addWidget(self.delete_all_btn)
-
-        self.refresh_btn = QPushButton("Refresh")
-        self.refresh_btn.setMinimumHeight(35)
-        control_layout.addWidget(self.refresh_btn)
-
-        parent_layout.addWidget(control_group)
-
-        # Import/Export section
-        io_group = QGroupBox("Import/Export")
-        io_layout = QHBoxLayout(io_group)
-
-        self.export_btn = QPushButton("Export to JSON")
-        self.export_btn.setMinimumHeight(35)
-        self.export_btn.setStyleSheet("QPushButton { background-color: #FF9800; color: white; }")
-        io_layout.addWidget(self.export_btn)
-
-        self.import_btn = QPushButton("Import from JSON")
-        self.import_btn.setMinimumHeight(35)
-        self.import_btn.setStyleSheet("QPushButton { background-color: #2196F3; color: white; }")
-        io_layout.addWidget(self.import_btn)
-
-        parent_layout.addWidget(io_group)
+        self._add_lazy_section(parent_layout, "control_group", "Control", QGridLayout,
+                               functools.partial(self._add_spec_buttons, "control"))
+        self._add_lazy_section(parent_layout, "io_group", "Import/Export", QGridLayout,
+                               functools.partial(self._add_spec_buttons, "io"))
 
     def connect_signals(self):
-        """Connect button signals to their respective slots"""
-        # Individual muscle buttons
-        self.trapezius_btn.clicked.connect(lambda: self.create_muscle("Trapezius"))
-        self.latissimus_btn.clicked.connect(lambda: self.create_muscle("LatissimusDorsi"))
-        self.teres_major_btn.clicked.connect(lambda: self.create_muscle("TerasMajor"))
-        self.pectoralis_btn.clicked.connect(lambda: self.create_muscle("PectoralisMajor"))
-        self.deltoid_btn.clicked.connect(lambda: self.create_muscle("Deltoid"))
-        self.upper_arm_btn.clicked.connect(lambda: self.create_muscle("UpperArm"))
-
-        # Helper bone buttons
-        self.scapula_btn.clicked.connect(self.add_scapula_joints)
-        self.mirror_scapula_btn.clicked.connect(self.mirror_scapula_joints)
-
-        # Twist joint buttons
-        self.twist_joint_btn.clicked.connect(self.setup_twist_joint_chain)
-        self.counter_twist_btn.clicked.connect(self.setup_counter_twist_chain)
-        self.non_flip_twist_btn.clicked.connect(self.setup_non_flip_twist)
-
-        # Average & Push joint buttons
-        self.create_avg_push_btn.clicked.connect(self.create_avg_push_from_selection)
-        self.batch_all_avg_push_btn.clicked.connect(self.batch_create_all_avg_push)
-
-        # Batch creation buttons
-        self.create_all_btn.clicked.connect(self.create_all_muscles)
-        self.create_torso_btn.clicked.connect(self.create_torso_muscles)
-        self.create_arms_btn.clicked.connect(self.create_arm_muscles)
-
-        # Control buttons
-        self.finalize_btn.clicked.connect(self.finalize_all_muscles)
-        self.delete_all_btn.clicked.connect(self.delete_all_muscles)
-        self.refresh_btn.clicked.connect(self.refresh_ui)
-
-        # Import/Export buttons
-        self.export_btn.clicked.connect(self.export_muscles)
-        self.import_btn.clicked.connect(self.import_muscles)
+        """Connect the settings widgets, the buttons are connected as _add_spec_buttons creates them"""
+        # The selection based buttons say what they need, they are enabled as the selection changes
+        for attr, _, _, _, tooltip in _SELECTION_BUTTONS:
+            getattr(self, attr).setToolTip(tooltip)
+
+        # Average & Push settings cache, the axes are stored lower case as avg_push_joint expects them
+        for key, attr in _AVG_PUSH_PARAM_SPINS:
+            spin = getattr(self, attr)
+            spin.setProperty("paramKey", key)
+            self._params[key] = spin.value()
+            spin.valueChanged.connect(self._on_param_spin_changed)
+        for key, attr in _AVG_PUSH_PARAM_COMBOS:
+            combo = getattr(self, attr)
+            combo.setProperty("paramKey", key)
+            self._params[key] = combo.currentText().lower()
+            combo.currentTextChanged.connect(self._on_param_combo_changed)
+
+    @Slot()
+    def _on_muscle_button(self):
+        """Create the muscle type stored on the clicked muscle button"""
+        self._replace_policy = None
+        self.create_muscle(self.sender().property("muscleType"))
+
+    @Slot(float)
+    def _on_param_spin_changed(self, value):
+        """Cache the new value of an Average & Push spin box under its paramKey"""
+        self._params[self.sender().property("paramKey")] = value
+
+    @Slot(str)
+    def _on_param_combo_changed(self, text):
+        """Cache the new axis of an Average & Push combo box under its paramKey"""
+        self._params[self.sender().property("paramKey")] = text.lower()
 
     def get_muscle_class(self, muscle_type):
         """Get the appropriate muscle class"""
-        muscle_classes = {
-            "Trapezius": mt.TrapeziusMuscles,
-            "LatissimusDorsi": mt.LatissimusDorsiMuscles,
-            "TerasMajor": mt.TerasMajorMuscles,
-            "PectoralisMajor": mt.PectoralisMajorMuscles,
-            "Deltoid": mt.DeltoidMuscles,
-            "UpperArm": mt.UpperArmMuscles
-        }
-        return muscle_classes.get(muscle_type)
+        class_name = _MUSCLE_CLASSES.get(muscle_type)
+        return getattr(_muscle_template(), class_name) if class_name else None
 
+    @Slot(str)
     def create_muscle(self, muscle_type):
-        """Create a specific muscle type"""
+        """Create a specific muscle type, reporting the result to the user"""
         try:
-            muscle_class = self.get_muscle_class(muscle_type)
-            if not muscle_class:
-                self.show_error(f"Unknown muscle type: {muscle_type}")
-                return
+            created, errors = self._build_muscle(muscle_type)
+        except Exception as e:
+            self.show_error(f"Error creating {muscle_type}: {str(e)}")
+            return
 
-            side = self.side_combo.currentText()
-            auto_mirror = self.auto_mirror_check.isChecked()
+        for side, error in errors:
+            self.show_error(f"Failed to create {side} {muscle_type}: {str(error)}")
+        if created:
+            self.show_success(f"Successfully created {muscle_type} muscle(s)")
 
-            sides_to_create = []
-            if side == "Both":
-                sides_to_create = ["Left", "Right"]
+    def _build_muscle(self, muscle_type):
+        """
+        Create a specific muscle type on the planned sides without reporting to the user.
+        Raises for errors that stop the whole muscle, the sides that failed are returned instead.
+        Return (whether any side was created, [(side, error)] of the failed sides).
+        """
+        if not self.get_muscle_class(muscle_type):
+            raise ValueError(f"Unknown muscle type: {muscle_type}")
+
+        primary_side, mirror_side = self._creation_plan()
+        # the existing primary muscle the user chose to keep, if any
+        kept_primary = None
+
+        # Check the existing muscles once, with a single prompt for all of them
+        muscle_names = {current_side: f"{current_side}{muscle_type}"
+                        for current_side in (primary_side, mirror_side) if current_side}
+        # muscles deleted from the scene since they were created don't need replacing
+        self._prune_stale_muscles(muscle_names.values())
+        existing = [muscle_name for muscle_name in muscle_names.values() if muscle_name in self.created_muscles]
+        if existing:
+            if self._confirm_replace(existing):
+                for muscle_name in existing:
+                    self._untrack_muscle(muscle_name).delete()
             else:
-                sides_to_create = [side]
-                if auto_mirror and side in ["Left", "Right"]:
-                    other_side = "Right" if side == "Left" else "Left"
-                    sides_to_create.append(other_side)
-
-            created_muscles = []
-            for current_side in sides_to_create:
-                try:
-                    # Create muscle instance
-                    muscle_name = f"{current_side}{muscle_type}"
-
-                    # Check if muscle already exists
-                    if muscle_name in self.created_muscles:
-                        reply = QMessageBox.question(
-                            self, "Muscle Exists",
-                            f"{muscle_name} already exists. Replace it?",
-                            QMessageBox.Yes | QMessageBox.No,
-                            QMessageBox.No
-                        )
-                        if reply == QMessageBox.No:
-                            continue
-                        else:
-                            # Delete existing muscle
-                            self.created_muscles[muscle_name].delete()
-                            del self.created_muscles[muscle_name]
-
-                    # Create new muscle
-                    if current_side == sides_to_create[0]:
-                        # Create primary muscle
-                        muscle = muscle_class(side=current_side)
-                        muscle.add()
-                        created_muscles.append(muscle)
-                        self.created_muscles[muscle_name] = muscle
-                        logger.info(f"Created {muscle_name}")
-
-                    else:
-                        # Mirror from first created muscle
-                        if created_muscles:
-                            primary_muscle = created_muscles[0]
-                            mirrored_muscle = primary_muscle.mirror()
-                            created_muscles.append(mirrored_muscle)
-                            self.created_muscles[muscle_name] = mirrored_muscle
-                            logger.info(f"Mirrored {muscle_name}")
-
-                except Exception as e:
-                    self.show_error(f"Failed to create {current_side} {muscle_type}: {str(e)}")
-                    logger.error(f"Error creating {current_side} {muscle_type}: {e}")
+                # keep the existing ones, the other side is still mirrored from a kept primary
+                if muscle_names[primary_side] in existing:
+                    kept_primary = self.created_muscles[muscle_names[primary_side]]
+                    primary_side = None
+                if mirror_side and muscle_names[mirror_side] in existing:
+                    mirror_side = None
+
+        # The primary muscle is created, the other side is mirrored from it
+        errors = []
+        primary = mirrored = None
+        if primary_side:
+            primary = self._add_muscle_side(muscle_type, primary_side, muscle_names[primary_side], errors)
+        if mirror_side:
+            mirrored = self._add_muscle_side(muscle_type, mirror_side, muscle_names[mirror_side], errors,
+                                             mirror_from=primary or kept_primary)
+        return bool(primary or mirrored), errors
+
+    def _creation_plan(self):
+        """
+        Get the (primary side, mirror side) a muscle is created on from the side and auto mirror options.
+        "Both" is the same as Left mirrored to Right, the mirror side is None when nothing is mirrored.
+        """
+        side = self.side_combo.currentText()
+        if side == "Both":
+            return "Left", "Right"
+        if self.auto_mirror_check.isChecked() and side in ("Left", "Right"):
+            return side, "Right" if side == "Left" else "Left"
+        return side, None
+
+    def _resolve_conflicts(self, muscle_types):
+        """
+        Ask once, before a batch, whether the muscles of the batch that already exist should be replaced.
+        The answer is kept as the replace policy, so create_muscle doesn't ask again for each muscle.
+        """
+        self._replace_policy = None
+        sides = [side for side in self._creation_plan() if side]
+        muscle_names = [f"{side}{muscle_type}" for muscle_type in muscle_types for side in sides]
+        self._prune_stale_muscles(muscle_names)
+        existing = [muscle_name for muscle_name in muscle_names if muscle_name in self.created_muscles]
+        if not existing:
+            return
 
-            if created_muscles:
-                self.show_success(f"Successfully created {muscle_type} muscle(s)")
+        reply = QMessageBox.question(
+            self, "Muscles Exist",
+            f"{len(existing)} muscle(s) already exist: {', '.join(existing)}. Replace them?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        self._replace_policy = "yes-all" if reply == QMessageBox.Yes else "no-all"
 
+    def _add_muscle_side(self, muscle_type, side, muscle_name, errors, mirror_from=None):
+        """
+        Create one side of a muscle, mirrored from mirror_from if given, and track it.
+        Errors are appended to errors as (side, error) and return None.
+        """
+        try:
+            if mirror_from is not None:
+                muscle = self._mirror_muscle(mirror_from)
+            else:
+                muscle = self._create_muscle_one_side(muscle_type, side)
+            self._track_muscle(muscle_name, muscle)
+            return muscle
         except Exception as e:
-            self.show_error(f"Error creating {muscle_type}: {str(e)}")
-            logger.error(f"Error in create_muscle: {e}")
+            errors.append((side, e))
+            return None
+
+    def _create_muscle_one_side(self, muscle_type, side):
+        """Create and add a muscle component on the given side"""
+        muscle = self.get_muscle_class(muscle_type)(side=side)
+        muscle.add()
+        logger.info("Created %s%s", side, muscle_type)
+        return muscle
+
+    def _mirror_muscle(self, primary_muscle):
+        """Mirror a muscle component to the other side"""
+        mirrored_muscle = primary_muscle.mirror()
+        logger.info("Mirrored %s", mirrored_muscle)
+        return mirrored_muscle
+
+    def _confirm_replace(self, muscle_names):
+        """
+        Ask whether existing muscles should be replaced.
+        A batch answers once in _resolve_conflicts, its replace policy is used here instead of asking.
+        """
+        if self._replace_policy == "yes-all":
+            return True
+        if self._replace_policy == "no-all":
+            return False
 
+        reply = QMessageBox.question(
+            self, "Muscle Exists",
+            f"{', '.join(muscle_names)} already exist(s). Replace?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        return reply == QMessageBox.Yes
+
+    @contextlib.contextmanager
+    def _frozen_scroll_area(self):
+        """Stop the muscle scroll area from repainting while a batch of scene edits runs"""
+        viewport = self.scroll_area.viewport()
+        viewport.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            viewport.setUpdatesEnabled(True)
+
+    def _create_muscle_batch(self, muscle_types, chunk_name):
+        """Create the given muscle types in one scene batch, logging the failures once, and return the failed types"""
+        failures = []
+        with self._frozen_scroll_area(), _utils().batchSceneEdit(chunk_name):
+            for muscle_type in muscle_types:
+                try:
+                    _, errors = self._build_muscle(muscle_type)
+                except Exception as e:
+                    errors = [("", e)]
+                failures.extend((muscle_type, side, error) for side, error in errors)
+        if failures:
+            logger.error("Failed to create: %s", "; ".join(f"{side}{muscle_type}: {error}"
+                                                           for muscle_type, side, error in failures))
+        return list(dict.fromkeys(muscle_type for muscle_type, _, _ in failures))
+
+    @Slot()
+    @_single_flight
     def create_all_muscles(self):
         """Create all available muscle types"""
-        muscle_types = ["Trapezius", "LatissimusDorsi", "TerasMajor", "PectoralisMajor", "Deltoid", "UpperArm"]
+        # one replace prompt for the whole batch
+        self._resolve_conflicts(_ALL_MUSCLES)
 
-        failed_muscles = []
-        for muscle_type in muscle_types:
-            try:
-                self.create_muscle(muscle_type)
-            except Exception as e:
-                failed_muscles.append(muscle_type)
-                logger.error(f"Failed to create {muscle_type}: {e}")
+        failed_muscles = self._create_muscle_batch(_ALL_MUSCLES, "createAllMuscles")
 
         if failed_muscles:
             self.show_error(f"Failed to create: {', '.join(failed_muscles)}")
         else:
             self.show_success("Successfully created all muscles!")
 
+    @Slot()
+    @_single_flight
     def create_torso_muscles(self):
         """Create only torso muscles"""
-        torso_muscles = ["Trapezius", "LatissimusDorsi", "TerasMajor", "PectoralisMajor"]
+        # one replace prompt for the whole batch
+        self._resolve_conflicts(_TORSO_MUSCLES)
 
-        for muscle_type in torso_muscles:
-            try:
-                self.create_muscle(muscle_type)
-            except Exception as e:
-                logger.error(f"Failed to create {muscle_type}: {e}")
+        failed_muscles = self._create_muscle_batch(_TORSO_MUSCLES, "createTorsoMuscles")
 
-        self.show_success("Torso muscles created!")
+        if failed_muscles:
+            self.show_error(f"Failed to create: {', '.join(failed_muscles)}")
+        else:
+            self.show_success("Torso muscles created!")
 
+    @Slot()
+    @_single_flight
     def create_arm_muscles(self):
         """Create only arm and shoulder muscles"""
-        arm_muscles = ["Deltoid", "UpperArm"]
+        # one replace prompt for the whole batch
+        self._resolve_conflicts(_ARM_MUSCLES)
 
-        for muscle_type in arm_muscles:
-            try:
-                self.create_muscle(muscle_type)
-            except Exception as e:
-                logger.error(f"Failed to create {muscle_type}: {e}")
+        failed_muscles = self._create_muscle_batch(_ARM_MUSCLES, "createArmMuscles")
 
-        self.show_success("Arm muscles created!")
+        if failed_muscles:
+            self.show_error(f"Failed to create: {', '.join(failed_muscles)}")
+        else:
+            self.show_success("Arm muscles created!")
 
+    @Slot()
     def finalize_all_muscles(self):
         """Finalize all created muscles"""
         if not self.created_muscles:
             self.show_error("No muscles to finalize!")
             return
 
-        try:
-            for muscle_name, muscle in self.created_muscles.items():
+        # a broken muscle shouldn't stop the others from being finalized
+        errors = []
+        finalized = []
+        for muscle in self.created_muscles.values():
+            try:
                 muscle.finalize()
-                logger.info(f"Finalized {muscle_name}")
+                finalized.append(muscle)
+            except Exception as e:
+                errors.append((muscle, e))
+        if finalized:
+            logger.info("Finalized muscles: %s", ", ".join(str(muscle) for muscle in finalized))
 
+        if errors:
+            self.show_error("Error finalizing muscles:\n" +
+                            "\n".join(f"{muscle}: {str(e)}" for muscle, e in errors))
+        else:
             self.show_success("All muscles finalized!")
 
-        except Exception as e:
-            self.show_error(f"Error finalizing muscles: {str(e)}")
-            logger.error(f"Error in finalize_all_muscles: {e}")
-
+    @Slot()
     def delete_all_muscles(self):
         """Delete all created muscles"""
         if not self.created_muscles:
@@ -618,35 +855,66 @@ class MuscleRigUI(QMainWindow):
         )
 
         if reply == QMessageBox.Yes:
-            try:
-                for muscle_name, muscle in self.created_muscles.items():
+            # the muscles that fail to delete stay tracked
+            errors = []
+            deleted = []
+            for muscle_name, muscle in list(self.created_muscles.items()):
+                try:
                     muscle.delete()
-                    logger.info(f"Deleted {muscle_name}")
+                    deleted.append(muscle)
+                    self._untrack_muscle(muscle_name)
+                except Exception as e:
+                    errors.append((muscle, e))
+            if deleted:
+                logger.info("Deleted muscles: %s", ", ".join(str(muscle) for muscle in deleted))
 
-                self.created_muscles.clear()
+            if errors:
+                self.show_error("Error deleting muscles:\n" +
+                                "\n".join(f"{muscle}: {str(e)}" for muscle, e in errors))
+            else:
                 self.show_success("All muscles deleted!")
 
-            except Exception as e:
-                self.show_error(f"Error deleting muscles: {str(e)}")
-                logger.error(f"Error in delete_all_muscles: {e}")
-
+    def _track_muscle(self, muscle_name, muscle):
+        """Store a created muscle along with handles to its muscle origins"""
+        # the handles are built first, so a muscle whose origins can't be found is not tracked at all
+        selection = om.MSelectionList()
+        for muscle_joint_group in muscle.muscleJointGroups.values():
+            selection.add(muscle_joint_group.muscleOrigin)
+        handles = [om.MObjectHandle(selection.getDependNode(i)) for i in range(selection.length())]
+        self.created_muscles[muscle_name] = muscle
+        self._muscle_handles[muscle_name] = handles
+
+    def _untrack_muscle(self, muscle_name):
+        """Stop tracking a muscle and its handles, return the muscle"""
+        self._muscle_handles.pop(muscle_name, None)
+        return self.created_muscles.pop(muscle_name)
+
+    def _muscle_alive(self, muscle_name):
+        """
+        Check if the muscle origins of a tracked muscle still exist, in-process through their handles.
+        A muscle without handles can't be checked and counts as stale.
+        """
+        handles = self._muscle_handles.get(muscle_name)
+        return bool(handles) and all(handle.isValid() and handle.isAlive() for handle in handles)
+
+    def _prune_stale_muscles(self, muscle_names=None):
+        """Stop tracking the given muscles, or all of them, whose muscle origins were deleted from the scene"""
+        if muscle_names is None:
+            muscle_names = list(self.created_muscles)
+        for muscle_name in muscle_names:
+            if muscle_name in self.created_muscles and not self._muscle_alive(muscle_name):
+                self._untrack_muscle(muscle_name)
+
+    @Slot()
     def refresh_ui(self):
         """Refresh the UI state"""
-        # Clear non-existent muscles from tracking
-        muscles_to_remove = []
-        for muscle_name, muscle in self.created_muscles.items():
-            try:
-                # Check if muscle still exists in scene
-                if not cmds.objExists(muscle.muscleOrigin):
-                    muscles_to_remove.append(muscle_name)
-            except:
-                muscles_to_remove.append(muscle_name)
-
-        for muscle_name in muscles_to_remove:
-            del self.created_muscles[muscle_name]
+        # Clear non-existent muscles from tracking, the handles are checked in-process instead of
+        # going through a maya command per muscle
+        self._prune_stale_muscles()
 
         self.show_success(f"UI refreshed. Tracking {len(self.created_muscles)} muscles.")
 
+    @Slot()
     def export_muscles(self):
         """Export current muscles to JSON file"""
         try:
@@ -654,26 +922,27 @@ class MuscleRigUI(QMainWindow):
             file_path, _ = QFileDialog.getSaveFileName(
                 self,
                 "Export Muscles to JSON",
-                "",
+                self._last_io_dir,
                 "JSON Files (*.json);;All Files (*)"
             )
 
             if not file_path:
                 return
+            self._last_io_dir = os.path.dirname(file_path)
 
             # Ensure .json extension
-            if not file_path.endswith('.json'):
+            if os.path.splitext(file_path)[1].lower() != '.json':
                 file_path += '.json'
 
             # Use utils export function
-            utils.exportMuscles(file_path)
+            _utils().exportMuscles(file_path)
             self.show_success(f"Muscles exported successfully to:\n{file_path}")
-            logger.info(f"Exported muscles to {file_path}")
+            logger.info("Exported muscles to %s", file_path)
 
         except Exception as e:
             self.show_error(f"Error exporting muscles: {str(e)}")
-            logger.error(f"Error in export_muscles: {e}")
 
+    @Slot()
     def import_muscles(self):
         """Import muscles from JSON file"""
         try:
@@ -681,12 +950,13 @@ class MuscleRigUI(QMainWindow):
             file_path, _ = QFileDialog.getOpenFileName(
                 self,
                 "Import Muscles from JSON",
-                "",
+                self._last_io_dir,
                 "JSON Files (*.json);;All Files (*)"
             )
 
             if not file_path:
                 return
+            self._last_io_dir = os.path.dirname(file_path)
 
             # Confirm import
             reply = QMessageBox.question(
@@ -700,22 +970,21 @@ class MuscleRigUI(QMainWindow):
                 return
 
             # Use utils generate function
-            utils.generateMusclesFromFile(file_path)
+            _utils().generateMusclesFromFile(file_path)
+            # Update the muscle tracking without refresh_ui, its status message would replace the import result
+            self._prune_stale_muscles()
             self.show_success(f"Muscles imported successfully from:\n{file_path}")
-            logger.info(f"Imported muscles from {file_path}")
-
-            # Refresh UI to track imported muscles
-            self.refresh_ui()
+            logger.info("Imported muscles from %s", file_path)
 
         except Exception as e:
             self.show_error(f"Error importing muscles: {str(e)}")
-            logger.error(f"Error in import_muscles: {e}")
 
+    @Slot()
     def create_avg_push_from_selection(self):
         """Create both average and push joints from selected joint(s)"""
         try:
-            # Get current selection
-            selection = cmds.ls(selection=True, type='joint')
+            # Get current selection, as MDagPaths so avg_push_joint doesn't have to look the names up again
+            selection = self._selected_dag_paths(om.MFn.kJoint)
 
             # Validate selection - now we only need 1 joint (target), driver will be auto-detected
             if len(selection) == 0:
@@ -729,49 +998,52 @@ class MuscleRigUI(QMainWindow):
             driver_joint = selection[1] if len(selection) == 2 else None
 
             # Get parameters from UI
-            weight = self.avg_weight_spin.value()
-            twist_axis = self.avg_twist_axis_combo.currentText().lower()
-            push_axis = self.avg_push_axis_combo.currentText().lower()
-            scale_value = self.push_scale_value_spin.value()
+            params = self._params
+            weight = params["weight"]
+            twist_axis = params["twist_axis"]
+            push_axis = params["push_axis"]
+            scale_value = params["scale_value"]
 
             # Remap value parameters
-            input_min = self.remap_input_min_spin.value()
-            input_max = self.remap_input_max_spin.value()
-            output_min = self.remap_output_min_spin.value()
-            output_max = self.remap_output_max_spin.value()
+            input_min = params["input_min"]
+            input_max = params["input_max"]
+            output_min = params["output_min"]
+            output_max = params["output_max"]
 
             # Create average and push joints using the rewritten function
-            avg_jnt, push_jnt = avg_push_joint.createAvgPushJointForFinger(
-                finger_joint=target_joint,
-                driver_joint=driver_joint,
-                weight=weight,
-                driver_axis=twist_axis,
-                distance_axis=push_axis,
-                scale_axis='x',
-                driver_value=input_max,  # Use input_max as the driver value
-                distance_value=output_max,  # Use output_max as the distance value
-                scale_value=scale_value,
-                create_push=True,
-                input_min=input_min,
-                input_max=input_max,
-                output_min=output_min,
-                output_max=output_max
-            )
-
-            driver_info = driver_joint if driver_joint else "auto-detected parent"
-            self.show_success(f"Successfully created avg + push joints:\n" +
-                            f"Target: {target_joint}\n" +
-                            f"Driver: {driver_info}\n" +
-                            f"Average: {avg_jnt}\n" +
-                            f"Push: {push_jnt}\n" +
-                            f"{twist_axis.upper()} rotation → {push_axis.upper()} push\n" +
+            with _utils().batchSceneEdit("createAvgPushFromSelection"):
+                avg_jnt, push_jnt = _avg_push().createAvgPushJointForFinger(
+                    finger_joint=target_joint,
+                    driver_joint=driver_joint,
+                    weight=weight,
+                    driver_axis=twist_axis,
+                    distance_axis=push_axis,
+                    scale_axis='x',
+                    driver_value=input_max,  # Use input_max as the driver value
+                    distance_value=output_max,  # Use output_max as the distance value
+                    scale_value=scale_value,
+                    create_push=True,
+                    input_min=input_min,
+                    input_max=input_max,
+                    output_min=output_min,
+                    output_max=output_max
+                )
+
+            driver_info = driver_joint.partialPathName() if driver_joint else "auto-detected parent"
+            self.show_success(f"Successfully created avg + push joints:\n"
+                            f"Target: {target_joint.partialPathName()}\n"
+                            f"Driver: {driver_info}\n"
+                            f"Average: {avg_jnt}\n"
+                            f"Push: {push_jnt}\n"
+                            f"{twist_axis.upper()} rotation → {push_axis.upper()} push\n"
                             f"Remap: [{input_min}, {input_max}] → [{output_min}, {output_max}]")
-            logger.info(f"Created avg + push: {avg_jnt}, {push_jnt}")
+            logger.info("Created avg + push: %s, %s", avg_jnt, push_jnt)
 
         except Exception as e:
             self.show_error(f"Error creating avg + push joints:\n{str(e)}")
-            logger.error(f"Error in create_avg_push_from_selection: {e}")
 
+    @Slot()
+    @_single_flight
     def batch_create_all_avg_push(self):
         """Batch create average and push joints for fingers, elbows, and knees"""
         try:
@@ -779,67 +1051,85 @@ class MuscleRigUI(QMainWindow):
             side = 'Both'
 
             # Get parameters from UI
-            weight = self.avg_weight_spin.value()
-            twist_axis = self.avg_twist_axis_combo.currentText().lower()
-            push_axis = self.avg_push_axis_combo.currentText().lower()
-            scale_value = self.push_scale_value_spin.value()
+            params = self._params
+            weight = params["weight"]
+            twist_axis = params["twist_axis"]
+            push_axis = params["push_axis"]
+            scale_value = params["scale_value"]
 
             # Remap value parameters
-            input_min = self.remap_input_min_spin.value()
-            input_max = self.remap_input_max_spin.value()
-            output_min = self.remap_output_min_spin.value()
-            output_max = self.remap_output_max_spin.value()
+            input_min = params["input_min"]
+            input_max = params["input_max"]
+            output_min = params["output_min"]
+            output_max = params["output_max"]
+
+            progress = QProgressDialog("Creating avg + push joints...", "Cancel", 0, 0, self)
+            # application modal: the events processed for the cancel button must not let the user edit the scene
+            # in Maya's main window, those edits would land in the batch undo chunk and be undone on cancel
+            progress.setWindowModality(Qt.ApplicationModal)
+            progress.setMinimumDuration(0)
+
+            def report_progress(done, total, joint):
+                progress.setMaximum(total)
+                progress.setValue(done)
+                progress.setLabelText(f"Creating avg + push joints...\n{joint}")
+                QApplication.processEvents()
+                if progress.wasCanceled():
+                    raise _avg_push().BatchCancelled()
 
             # Call the rewritten batch function - only fingers, no elbows/knees
-            created_joints = avg_push_joint.batchCreateAllAvgPush(
-                side=side,
-                fingers=None,  # Uses default: ['Thumb', 'Index', 'Middle', 'Ring', 'Pinky']
-                weight=weight,
-                driver_axis=twist_axis,
-                distance_axis=push_axis,
-                scale_axis='x',
-                driver_value=input_max,
-                distance_value=output_max,
-                scale_value=scale_value,
-                input_min=input_min,
-                input_max=input_max,
-                output_min=output_min,
-                output_max=output_max,
-                include_limbs=False  # Only create for fingers, not elbows/knees
-            )
+            try:
+                with self._frozen_scroll_area(), _utils().batchSceneEdit("batchCreateAllAvgPush"):
+                    created_joints = _avg_push().batchCreateAllAvgPush(
+                        side=side,
+                        fingers=None,  # Uses default: ['Thumb', 'Index', 'Middle', 'Ring', 'Pinky']
+                        weight=weight,
+                        driver_axis=twist_axis,
+                        distance_axis=push_axis,
+                        scale_axis='x',
+                        driver_value=input_max,
+                        distance_value=output_max,
+                        scale_value=scale_value,
+                        input_min=input_min,
+                        input_max=input_max,
+                        output_min=output_min,
+                        output_max=output_max,
+                        include_limbs=False,  # Only create for fingers, not elbows/knees
+                        progress_callback=report_progress
+                    )
+            except _avg_push().BatchCancelled:
+                # the batch ran in a single undo chunk, undoing it removes the joints created before the cancel
+                cmds.undo()
+                logger.info("Batch avg+push creation cancelled")
+                return
+            finally:
+                progress.close()
 
             # Build success message with details
-            success_msg = f"Successfully batch created avg + push joints:\n"
-            success_msg += f"Total joints processed: {len(created_joints)}\n"
-            success_msg += f"Includes: All fingers (Base/Mid/Tip) for Both sides\n"
-            success_msg += f"Weight: {weight}\n"
-            success_msg += f"{twist_axis.upper()} rotation → {push_axis.upper()} push\n"
-            success_msg += f"Remap: [{input_min}, {input_max}] → [{output_min}, {output_max}]"
+            success_msg = (f"Successfully batch created avg + push joints:\n"
+                           f"Total joints processed: {len(created_joints)}\n"
+                           f"Includes: All fingers (Base/Mid/Tip) for Both sides\n"
+                           f"Weight: {weight}\n"
+                           f"{twist_axis.upper()} rotation → {push_axis.upper()} push\n"
+                           f"Remap: [{input_min}, {input_max}] → [{output_min}, {output_max}]")
 
             self.show_success(success_msg)
-            logger.info(f"Batch created {len(created_joints)} avg+push joint pairs")
+            logger.info("Batch created %s avg+push joint pairs", len(created_joints))
 
         except Exception as e:
             self.show_error(f"Error batch creating joints:\n{str(e)}")
-            logger.error(f"Error in batch_create_all_avg_push: {e}")
-
-    def get_axis_from_combo(self, combo_text):
-        """Parse axis combo box text to tuple"""
-        axis_map = {
-            "X (1,0,0)": (1, 0, 0),
-            "Y (0,1,0)": (0, 1, 0),
-            "Z (0,0,1)": (0, 0, 1),
-            "-X (-1,0,0)": (-1, 0, 0),
-            "-Y (0,-1,0)": (0, -1, 0),
-            "-Z (0,0,-1)": (0, 0, -1)
-        }
-        return axis_map.get(combo_text, (0, 1, 0))
 
+    @staticmethod
+    def get_axis_from_combo(combo_index):
+        """Get the axis vector of an axis combo box index"""
+        return _AXIS_VECTORS[combo_index] if 0 <= combo_index < len(_AXIS_VECTORS) else (0, 1, 0)
+
+    @Slot()
     def setup_twist_joint_chain(self):
         """Setup twist joint chain from selected joints"""
         try:
             # Get current selection
-            selection = cmds.ls(selection=True, type='joint')
+            selection = self._selected_nodes(om.MFn.kJoint)
 
             # Validate selection
             if len(selection) != 2:
@@ -851,29 +1141,30 @@ class MuscleRigUI(QMainWindow):
 
             # Get parameters from UI
             twist_count = self.twist_count_spin.value()
-            twist_axis = self.get_axis_from_combo(self.twist_axis_combo.currentText())
-            up_axis = self.get_axis_from_combo(self.up_axis_combo.currentText())
+            twist_axis = self.get_axis_from_combo(self.twist_axis_combo.currentIndex())
+            up_axis = self.get_axis_from_combo(self.up_axis_combo.currentIndex())
 
             # Call the rollBone function
-            twist_joints, basis_joint = rollBone.setupTwistJointChain(
-                startJoint, endJoint, twist_count, twist_axis, up_axis
-            )
-
-            self.show_success(f"Successfully created twist joint chain:\n" +
-                            f"Start: {startJoint}\n" +
-                            f"End: {endJoint}\n" +
+            with _utils().batchSceneEdit("setupTwistJointChain"):
+                twist_joints, basis_joint = _roll_bone().setupTwistJointChain(
+                    startJoint, endJoint, twist_count, twist_axis, up_axis
+                )
+
+            self.show_success(f"Successfully created twist joint chain:\n"
+                            f"Start: {startJoint}\n"
+                            f"End: {endJoint}\n"
                             f"Twist Joints: {len(twist_joints)}")
-            logger.info(f"Created twist joints: {twist_joints}")
+            logger.info("Created twist joints: %s", twist_joints)
 
         except Exception as e:
             self.show_error(f"Error setting up twist joint chain:\n{str(e)}")
-            logger.error(f"Error in setup_twist_joint_chain: {e}")
 
+    @Slot()
     def setup_counter_twist_chain(self):
         """Setup counter twist joint chain from selected joints"""
         try:
             # Get current selection
-            selection = cmds.ls(selection=True, type='joint')
+            selection = self._selected_nodes(om.MFn.kJoint)
 
             # Validate selection
             if len(selection) != 2:
@@ -885,29 +1176,30 @@ class MuscleRigUI(QMainWindow):
 
             # Get parameters from UI
             twist_count = self.twist_count_spin.value()
-            twist_axis = self.get_axis_from_combo(self.twist_axis_combo.currentText())
-            up_axis = self.get_axis_from_combo(self.up_axis_combo.currentText())
+            twist_axis = self.get_axis_from_combo(self.twist_axis_combo.currentIndex())
+            up_axis = self.get_axis_from_combo(self.up_axis_combo.currentIndex())
 
             # Call the rollBone function
-            twist_joints, up_joint, basis_joint = rollBone.setupCounterTwistJointChain(
-                startJoint, endJoint, twist_count, twist_axis, up_axis
-            )
-
-            self.show_success(f"Successfully created counter twist joint chain:\n" +
-                            f"Start: {startJoint}\n" +
-                            f"End: {endJoint}\n" +
+            with _utils().batchSceneEdit("setupCounterTwistJointChain"):
+                twist_joints, up_joint, basis_joint = _roll_bone().setupCounterTwistJointChain(
+                    startJoint, endJoint, twist_count, twist_axis, up_axis
+                )
+
+            self.show_success(f"Successfully created counter twist joint chain:\n"
+                            f"Start: {startJoint}\n"
+                            f"End: {endJoint}\n"
                             f"Twist Joints: {len(twist_joints)}")
-            logger.info(f"Created counter twist joints: {twist_joints}")
+            logger.info("Created counter twist joints: %s", twist_joints)
 
         except Exception as e:
             self.show_error(f"Error setting up counter twist chain:\n{str(e)}")
-            logger.error(f"Error in setup_counter_twist_chain: {e}")
 
+    @Slot()
     def setup_non_flip_twist(self):
         """Setup non-flip twist chain from selected joints"""
         try:
             # Get current selection
-            selection = cmds.ls(selection=True, type='joint')
+            selection = self._selected_nodes(om.MFn.kJoint)
 
             # Validate selection - need start, end, and up joint
             if len(selection) != 3:
@@ -919,65 +1211,68 @@ class MuscleRigUI(QMainWindow):
             upJoint = selection[2]
 
             # Get up axis from UI
-            up_axis_tuple = self.get_axis_from_combo(self.up_axis_combo.currentText())
-            up_axis = om.MVector(up_axis_tuple)
+            up_axis = _UP_VECTORS[self.up_axis_combo.currentIndex()]
 
             # Call the rollBone function
-            dot_product_joint = rollBone.setupNonFlipTwistChain(
-                startJoint, endJoint, upJoint, up_axis
-            )
-
-            self.show_success(f"Successfully created non-flip twist chain:\n" +
-                            f"Start: {startJoint}\n" +
-                            f"End: {endJoint}\n" +
+            with _utils().batchSceneEdit("setupNonFlipTwistChain"):
+                dot_product_joint = _roll_bone().setupNonFlipTwistChain(
+                    startJoint, endJoint, upJoint, up_axis
+                )
+
+            self.show_success(f"Successfully created non-flip twist chain:\n"
+                            f"Start: {startJoint}\n"
+                            f"End: {endJoint}\n"
                             f"Up Joint: {upJoint}")
-            logger.info(f"Created non-flip twist with dot product joint: {dot_product_joint}")
+            logger.info("Created non-flip twist with dot product joint: %s", dot_product_joint)
 
         except Exception as e:
             self.show_error(f"Error setting up non-flip twist chain:\n{str(e)}")
-            logger.error(f"Error in setup_non_flip_twist: {e}")
 
+    @Slot()
     def add_scapula_joints(self):
         """Add scapula joints based on selected locators"""
         try:
             # Get current selection
-            selection = cmds.ls(selection=True, transforms=True)
+            selection = self._selected_nodes(om.MFn.kTransform)
 
             # Validate selection
             if len(selection) != 3:
                 self.show_error("Please select exactly 3 locators:\n1. Acromion locator\n2. Scapula root locator\n3. Scapula tip locator")
                 return
 
-            # Get the three locators from selection
-            acromionLoc = selection[0]
-            scapulaLoc = selection[1]
-            scapulaTipLoc = selection[2]
-
-            # Verify they are valid objects
+            # Verify they are valid objects, resolving all three names through one selection list
+            locator_list = om.MSelectionList()
             for loc in selection:
-                if not cmds.objExists(loc):
+                try:
+                    locator_list.add(loc)
+                except RuntimeError:
                     self.show_error(f"Selected object does not exist: {loc}")
                     return
 
+            # Get the three locators from selection, as unique DAG path names
+            acromionLoc, scapulaLoc, scapulaTipLoc = (
+                locator_list.getDagPath(i).partialPathName() for i in range(locator_list.length())
+            )
+
             # Get side from UI
             side = self.side_combo.currentText()
             if side == "Both":
                 side = "Left"  # Default to Left if Both is selected
 
             # Call the helper function to add scapula joints
-            created_joints = helper_bone.addScapulaJointsToBiped(acromionLoc, scapulaLoc, scapulaTipLoc, side=side)
+            with _utils().batchSceneEdit("addScapulaJoints"):
+                created_joints = _helper_bone().addScapulaJointsToBiped(acromionLoc, scapulaLoc, scapulaTipLoc, side=side)
 
-            self.show_success(f"Successfully created scapula joints for {side} side:\n" +
+            self.show_success(f"Successfully created scapula joints for {side} side:\n"
                             f"- {created_joints[0]}\n- {created_joints[1]}\n- {created_joints[2]}")
-            logger.info(f"Created scapula joints: {created_joints}")
+            logger.info("Created scapula joints: %s", created_joints)
 
         except RuntimeError as e:
             self.show_error(f"Failed to create scapula joints:\n{str(e)}")
-            logger.error(f"RuntimeError in add_scapula_joints: {e}")
         except Exception as e:
             self.show_error(f"Error creating scapula joints:\n{str(e)}")
-            logger.error(f"Error in add_scapula_joints: {e}")
 
+    @Slot()
     def mirror_scapula_joints(self):
         """Mirror scapula joints from one side to the other"""
         try:
@@ -987,45 +1282,129 @@ class MuscleRigUI(QMainWindow):
                 self.show_error("Please select either 'Left' or 'Right' as the source side for mirroring.")
                 return
 
+            # helper_bone has no mirror function yet, don't open a scene batch for a call that can't run
+            mirror_scapula = getattr(_helper_bone(), "mirrorScapulaJoints", None)
+            if mirror_scapula is None:
+                self.show_error("Mirroring scapula joints is not available yet:\n"
+                                "helper_bone has no mirrorScapulaJoints function.")
+                return
+
             # Call the mirror function
-            mirrored_joints = helper_bone.mirrorScapulaJoints(sourceSide=side)
+            with _utils().batchSceneEdit("mirrorScapulaJoints"):
+                mirrored_joints = mirror_scapula(sourceSide=side)
 
             target_side = "Right" if side == "Left" else "Left"
-            self.show_success(f"Successfully mirrored scapula joints from {side} to {target_side}:\n" +
+            self.show_success(f"Successfully mirrored scapula joints from {side} to {target_side}:\n"
                             f"- {mirrored_joints[0]}\n- {mirrored_joints[1]}\n- {mirrored_joints[2]}")
-            logger.info(f"Mirrored scapula joints: {mirrored_joints}")
+            logger.info("Mirrored scapula joints: %s", mirrored_joints)
 
         except RuntimeError as e:
             self.show_error(f"Failed to mirror scapula joints:\n{str(e)}")
-            logger.error(f"RuntimeError in mirror_scapula_joints: {e}")
         except Exception as e:
             self.show_error(f"Error mirroring scapula joints:\n{str(e)}")
-            logger.error(f"Error in mirror_scapula_joints: {e}")
+
+    def _on_selection_changed(self, *args):
+        """Drop the cached selection and enable the buttons the new selection is valid for"""
+        self._cached_selection = None
+        self._selection_by_type.clear()
+        self._update_selection_buttons()
+
+    def _update_selection_buttons(self):
+        """Enable the selection based buttons only while the selection has the node count they need"""
+        for attr, fn_type, minimum, maximum, _ in _SELECTION_BUTTONS:
+            getattr(self, attr).setEnabled(minimum <= len(self._selected_nodes(fn_type)) <= maximum)
+
+    def _filtered_selection(self, fn_type):
+        """
+        Get the (MDagPaths, names) of the selected dag nodes of exactly the given MFn type,
+        filtered once per selection
+        """
+        if fn_type in self._selection_by_type:
+            return self._selection_by_type[fn_type]
+
+        if self._cached_selection is None:
+            self._cached_selection = om.MGlobal.getActiveSelectionList(orderedSelectionIfAvailable=True)
+
+        dag_paths = []
+        for i in range(self._cached_selection.length()):
+            try:
+                dag_path = self._cached_selection.getDagPath(i)
+            except (TypeError, RuntimeError):
+                # not a dag node
+                continue
+            # the exact node type, hasFn would also match derived types, e.g. joints are kTransform too
+            if dag_path.apiType() == fn_type:
+                dag_paths.append(dag_path)
+
+        filtered = (tuple(dag_paths), tuple(dag_path.partialPathName() for dag_path in dag_paths))
+        self._selection_by_type[fn_type] = filtered
+        return filtered
+
+    def _selected_dag_paths(self, fn_type):
+        """Get the MDagPaths of the selected dag nodes of the given MFn type, in selection order"""
+        return self._filtered_selection(fn_type)[0]
+
+    def _selected_nodes(self, fn_type):
+        """Get the names of the selected dag nodes of the given MFn type, in selection order"""
+        return self._filtered_selection(fn_type)[1]
+
+    def showEvent(self, event):
+        """Watch the selection while the window is shown"""
+        if self._selection_callback_id is None:
+            # the selection may have changed while the window was hidden
+            self._on_selection_changed()
+            self._selection_callback_id = om.MEventMessage.addEventCallback("SelectionChanged",
+                                                                            self._on_selection_changed)
+        super(MuscleRigUI, self).showEvent(event)
+
+    def closeEvent(self, event):
+        """Remove the selection callback when the window is closed"""
+        if self._selection_callback_id is not None:
+            om.MMessage.removeCallback(self._selection_callback_id)
+            self._selection_callback_id = None
+        super(MuscleRigUI, self).closeEvent(event)
+
+    def _show_message(self, icon, title, message):
+        """Show a non-modal message box that deletes itself once dismissed, so the handler returns right away"""
+        message_box = QMessageBox(icon, title, message, QMessageBox.Ok, self)
+        message_box.setAttribute(Qt.WA_DeleteOnClose)
+        message_box.setWindowModality(Qt.NonModal)
+        message_box.show()
 
     def show_success(self, message):
-        """Show success message"""
-        QMessageBox.information(self, "Success", message)
+        """Show success message in the status bar for a few seconds, without a dialog to dismiss"""
+        self.statusBar().showMessage(" | ".join(line.strip() for line in message.splitlines() if line.strip()),
+                                     _STATUS_MESSAGE_TIMEOUT)
 
     def show_error(self, message):
         """Show error message"""
-        QMessageBox.critical(self, "Error", message)
-        logger.error(message)
+        self._show_message(QMessageBox.Critical, "Error", message)
+        # inside an except block the traceback is logged along with the message
+        logger.error(message, exc_info=sys.exc_info()[0] is not None)
+
+
+def _get_maya_main_window():
+    """Return Maya's main window as a QWidget, wrapping the pointer only once per session"""
+    global _maya_main_window
+    if _maya_main_window is None:
+        _maya_main_window = wrapInstance(int(omui.MQtUtil.mainWindow()), QWidget)
+    return _maya_main_window
 
 
 def show_muscle_ui():
-    """Show the muscle rig UI optimized for Maya 2023"""
+    """Show the muscle rig UI optimized for Maya 2023, reusing the window if it was opened before"""
+    global _UI_INSTANCE
     try:
-        # Maya 2023 specific imports
-        import maya.OpenMayaUI as omui
-        from shiboken2 import wrapInstance
+        if _UI_INSTANCE is None or not isValid(_UI_INSTANCE):
+            # Get Maya's main window
+            maya_main_window = _get_maya_main_window()
 
-        # Get Maya's main window
-        maya_main_window_ptr = omui.MQtUtil.mainWindow()
-        maya_main_window = wrapInstance(int(maya_main_window_ptr), QWidget)
+            # Create UI
+            _UI_INSTANCE = MuscleRigUI(parent=maya_main_window)
+            _UI_INSTANCE.setWindowFlags(_UI_INSTANCE.windowFlags() | Qt.Window)  # Ensure it's treated as a window
 
-        # Create and show UI
-        ui = MuscleRigUI(parent=maya_main_window)
-        ui.setWindowFlags(ui.windowFlags() | Qt.Window)  # Ensure it's treated as a window
+        # Show UI
+        ui = _UI_INSTANCE
         ui.show()
         ui.raise_()  # Bring to front
         ui.activateWindow()  # Activate the window
@@ -1039,6 +1418,17 @@ def show_muscle_ui():
         print(f"Error launching UI: {e}")
         return None
 
+
+def close_muscle_ui():
+    """Close and delete the muscle rig UI window, e.g. before reloading this module. The next show builds a new one"""
+    global _UI_INSTANCE
+    if _UI_INSTANCE is not None and isValid(_UI_INSTANCE):
+        # closing removes the selection callback
+        _UI_INSTANCE.close()
+        _UI_INSTANCE.deleteLater()
+    _UI_INSTANCE = None
+
+
 def test():
     print("import successfully")
 
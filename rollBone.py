@@ -2,15 +2,50 @@ import math
 import logging
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
+from . import utils
 
 logger = logging.getLogger(__name__)
 
+# cosine of the angle between the up vector and the plane normal below which they count as perpendicular
+PERPENDICULAR_TOLERANCE = 1e-6
+
 
 def calculateUpVecterPosition(startJoint, upJoint, offsetMatrix):
     newWorldMatrix = offsetMatrix * om.MMatrix(cmds.getAttr('{0}.worldMatrix'.format(startJoint)))
     localMatrix = newWorldMatrix * om.MMatrix(cmds.getAttr('{0}.parentInverseMatrix'.format(upJoint)))
-    translation = om.MTransformationMatrix(localMatrix).translation(4)
-    cmds.setAttr('{0}.t'.format(upJoint), *translation)
+    # the translation row of the local matrix, no need to decompose it
+    cmds.setAttr('{0}.t'.format(upJoint), localMatrix[12], localMatrix[13], localMatrix[14])
+
+
+def _createTwistJoint(name, parentJoint):
+    """create a joint under the parent joint without touching the selection, the radius defaults to 1.0"""
+    twistJoint = cmds.createNode('joint', name=name, parent=parentJoint, skipSelect=True)
+    # keep the scale compensation the joint command sets up
+    cmds.connectAttr('{0}.scale'.format(parentJoint), '{0}.inverseScale'.format(twistJoint))
+    return twistJoint
+
+
+def _distributeTwist(twistOffsetJoint, twistValueJoint, twistJoints, weights):
+    """
+    orient constrain each twist joint between the offset joint and the value joint,
+    the weight is the share of the twist value the twist joint follows
+    """
+    offsetWeightAttr = f'{twistOffsetJoint}W0'
+    valueWeightAttr = f'{twistValueJoint}W1'
+    for twistJoint, weight in zip(twistJoints, weights):
+        orientConstraint = cmds.orientConstraint(twistOffsetJoint, twistValueJoint, twistJoint,
+                                               maintainOffset=False, weight=1)[0]
+        # set orientConstraint interp Type to shortest
+        cmds.setAttr(f'{orientConstraint}.interpType', 2)
+        cmds.setAttr(f'{orientConstraint}.{offsetWeightAttr}', 1 - weight)
+        cmds.setAttr(f'{orientConstraint}.{valueWeightAttr}', weight)
+
+
+def getJointChainLength(startJoint, endJoint):
+    """world space distance between the start joint and the end joint"""
+    startX, startY, startZ = cmds.xform(startJoint, translation=True, q=True, ws=True)
+    endX, endY, endZ = cmds.xform(endJoint, translation=True, q=True, ws=True)
+    return math.sqrt((endX - startX) ** 2 + (endY - startY) ** 2 + (endZ - startZ) ** 2)
 
 
 def projectJointChainToPlane(startJoint, endJoint, upAxis, planeNormal=None, negative=False):
@@ -26,19 +61,29 @@ def projectJointChainToPlane(startJoint, endJoint, upAxis, planeNormal=None, neg
     """
     # rotate joint with one axis to project it to plane with given normal
     startJointMatrix = om.MMatrix(cmds.getAttr('{0}.worldMatrix'.format(startJoint)))
-    # get start joint world position
-    startJointWs = om.MVector([startJointMatrix.getElement(3, index) for index in range(3)])
     # get end joint world position
-    endJointMatrix = om.MMatrix(cmds.getAttr('{0}.worldMatrix'.format(endJoint)))
-    endJointWs = om.MVector([endJointMatrix.getElement(3, index) for index in range(3)])
+    endJointWs = om.MVector(cmds.xform(endJoint, q=True, ws=True, t=True))
+    quaternion = _projectionRotation(startJointMatrix, endJointWs, upAxis, planeNormal, negative)
+    _rotateJointBy(startJoint, quaternion)
+
+
+def _projectionRotation(startJointMatrix, endJointWs, upAxis, planeNormal=None, negative=False):
+    """
+    world space rotation of projectJointChainToPlane, computed from the start joint world matrix and
+    the end joint world position so several projections of the same pose can share one query
+    """
+    # get start joint world position: the translation row of the world matrix
+    startJointWs = om.MVector(startJointMatrix[12], startJointMatrix[13], startJointMatrix[14])
     # get world space up vector for start joint:
     startJointUpVec = upAxis * startJointMatrix
     # vector for joint chain
     aimVec = endJointWs - startJointWs
     if not planeNormal:
         planeNormal = aimVec
+    upDotNormal = startJointUpVec * planeNormal
     # if the joint chain is perpendicular to the plane...
-    if not startJointUpVec * planeNormal:
+    # (near perpendicular too, the projection would divide by an almost zero dot product)
+    if abs(upDotNormal) <= PERPENDICULAR_TOLERANCE * startJointUpVec.length() * planeNormal.length():
         axis = aimVec ^ startJointUpVec
         quaternion = om.MQuaternion()
         if negative:
@@ -47,24 +92,28 @@ def projectJointChainToPlane(startJoint, endJoint, upAxis, planeNormal=None, neg
             quaternion.setValue(axis, math.pi / 2.0)
     else:
 
-        d = aimVec * planeNormal / (startJointUpVec * planeNormal)
+        d = aimVec * planeNormal / upDotNormal
         # get the point projected to the plane
         p_ = endJointWs - d * startJointUpVec
         if negative:
-            targetVec = -om.MVector(p_ - startJointWs)
+            targetVec = startJointWs - p_
         else:
-            targetVec = om.MVector(p_ - startJointWs)
-        axis = aimVec ^ targetVec
-        quaternion = om.MQuaternion()
-        quaternion.setValue(axis, targetVec.angle(aimVec))
+            targetVec = p_ - startJointWs
+        # shortest arc rotation from the aim vector to the target vector
+        quaternion = om.MQuaternion(aimVec, targetVec)
+    return quaternion
+
 
+def _rotateJointBy(joint, quaternion):
+    """rotate the joint by the quaternion in world space"""
     sel_list = om.MSelectionList()
-    sel_list.add(startJoint)
+    sel_list.add(joint)
     dagPath = sel_list.getDagPath(0)
     transformFn = om.MFnTransform(dagPath)
     transformFn.rotateBy(quaternion, om.MSpace.kWorld)
 
 
+@utils.batchSceneEdit('setupTwistJointChain')
 def setupTwistJointChain(startJoint, endJoint=None, twistJointCount=3,
                          twistAxis=(0, 1, 0),
                          upAxis=(0, 0, 1)):
@@ -91,57 +140,49 @@ def setupTwistJointChain(startJoint, endJoint=None, twistJointCount=3,
     if not cmds.ls(endJoint):
         raise Exception('Cannot find a valid joint chain start with {0}'.format(startJoint))
 
+    # name prefix shared by all the helper joints
+    prefix = startJoint.lstrip('JO')
     # create twist joints
     twistJoints = []
     for index in range(twistJointCount):
-        cmds.select(startJoint)
-        twistJoint = cmds.joint()
-        twistJointName = startJoint.lstrip('JO') + f'Twist{index}'
-        cmds.rename(twistJoint, twistJointName)
-        twistJoints.append(twistJointName)
-
-    jointChainLength = (om.MVector(cmds.xform(endJoint, translation=True, q=True, ws=True)) - om.MVector(
-        cmds.xform(startJoint, translation=True, q=True, ws=True))).length()
+        twistJoints.append(_createTwistJoint(f'{prefix}Twist{index}', startJoint))
+
+    jointChainLength = getJointChainLength(startJoint, endJoint)
     # create offset between the last twist joint and end joint: this is used for skinweights transfer
     offsetRatio = 0.02
     jointChainLength *= (1 - offsetRatio)
     distributionDistance = jointChainLength / (len(twistJoints))
+    axisX, axisY, axisZ = twistAxis
     for index, twistJoint in enumerate(twistJoints):
-        translation = distributionDistance * om.MVector(twistAxis) * (index + 1)
-        cmds.setAttr('{0}.t'.format(twistJoint), *translation)
-        cmds.setAttr('{0}.radius'.format(twistJoint), 1.0)
+        distance = distributionDistance * (index + 1)
+        cmds.setAttr('{0}.t'.format(twistJoint), axisX * distance, axisY * distance, axisZ * distance)
 
     # setup twist basis joint grp
     cmds.select(clear=True)
-    twistBasisJoint1 = cmds.joint(name=startJoint.lstrip('JO') + 'TwistBasis1')
+    twistBasisJoint1 = cmds.joint(name=f'{prefix}TwistBasis1', radius=0.5)
     cmds.matchTransform(twistBasisJoint1, startJoint)
     cmds.parent(twistBasisJoint1, startJoint)
-    cmds.setAttr('{0}.radius'.format(twistBasisJoint1), 0.5)
     cmds.select(twistBasisJoint1)
-    twistValueJoint = cmds.joint(name=startJoint.lstrip('JO') + 'TwistValue1')
+    twistValueJoint = cmds.joint(name=f'{prefix}TwistValue1')
     cmds.aimConstraint(endJoint, twistValueJoint, aimVector=twistAxis, upVector=upAxis, worldUpType='objectrotation',
                      worldUpObject=endJoint, worldUpVector=upAxis, maintainOffset=False)
 
     # create twist offset joint
     cmds.select(twistBasisJoint1)
-    twistOffsetJoint = cmds.joint(name=startJoint.lstrip('JO') + 'BasisOffset1')
+    twistOffsetJoint = cmds.joint(name=f'{prefix}BasisOffset1')
 
     # use orient constraint to distribute the twisting along the joint chain.
     orientConstraint = cmds.orientConstraint(twistValueJoint, twistJoints[-1], maintainOffset=False, weight=1)[0]
     # set orientConstraint interp Type to shortest
     cmds.setAttr('{0}.interpType'.format(orientConstraint), 2)
     weightUnit = 1.0 / (twistJointCount)
-    for index in range(twistJointCount - 1):
-        orientConstraint = cmds.orientConstraint(twistOffsetJoint, twistValueJoint, twistJoints[index],
-                                               maintainOffset=False, weight=1)[0]
-        # set orientConstraint interp Type to shortest
-        cmds.setAttr('{0}.interpType'.format(orientConstraint), 2)
-        cmds.setAttr('{0}.{1}W0'.format(orientConstraint, twistOffsetJoint), (1 - weightUnit * (index + 1)))
-        cmds.setAttr('{0}.{1}W1'.format(orientConstraint, twistValueJoint), weightUnit * (index + 1))
+    _distributeTwist(twistOffsetJoint, twistValueJoint, twistJoints[:-1],
+                     [weightUnit * (index + 1) for index in range(twistJointCount - 1)])
 
     return twistJoints, twistBasisJoint1
 
 
+@utils.batchSceneEdit('setupCounterTwistJointChain')
 def setupCounterTwistJointChain(startJoint, endJoint=None, twistJointCount=3,
                                 twistAxis=(0, 1, 0),
                                 upAxis=(1, 0, 0)):
@@ -170,38 +211,32 @@ def setupCounterTwistJointChain(startJoint, endJoint=None, twistJointCount=3,
     if not cmds.ls(endJoint):
         raise Exception('Cannot find a valid joint chain start with {0}'.format(startJoint))
 
+    # name prefix shared by all the helper joints
+    prefix = startJoint.lstrip('JO')
     # create twist joint setup
     twistJoints = []
     for index in range(twistJointCount):
-        cmds.select(startJoint)
-        twistJoint = cmds.joint()
-        twistJointName = startJoint.lstrip('JO') + 'Twist{0}'.format(index)
-        cmds.rename(twistJoint, twistJointName)
-        twistJoints.append(twistJointName)
-
-    jointChainLength = (om.MVector(cmds.xform(endJoint, translation=True, q=True, ws=True)) - om.MVector(
-        cmds.xform(startJoint, translation=True, q=True, ws=True))).length()
+        twistJoints.append(_createTwistJoint(f'{prefix}Twist{index}', startJoint))
+
+    jointChainLength = getJointChainLength(startJoint, endJoint)
     # create offset between the first twist joint and start joint: this is used for skinweights transfer
     offsetRatio = 0.02
     offset = jointChainLength * offsetRatio
     distributionDistance = (jointChainLength - offset) / (len(twistJoints))
-
+    axisX, axisY, axisZ = twistAxis
     for index, twistJoint in enumerate(twistJoints):
-        translation = distributionDistance * om.MVector(twistAxis) * index + offset * om.MVector(twistAxis)
-        cmds.setAttr('{0}.t'.format(twistJoint), *translation)
-        cmds.setAttr('{0}.radius'.format(twistJoint), 1.0)
+        distance = distributionDistance * index + offset
+        cmds.setAttr('{0}.t'.format(twistJoint), axisX * distance, axisY * distance, axisZ * distance)
 
     # setup counterTwist joint with aim constraint
     cmds.select(clear=True)
-    twistBasisJointName = startJoint.lstrip('JO') + 'TwistBasis1'
-    twistBasisJoint = cmds.joint(name=twistBasisJointName)
-    cmds.setAttr('{0}.radius'.format(twistBasisJointName), 0.5)
+    twistBasisJointName = f'{prefix}TwistBasis1'
+    twistBasisJoint = cmds.joint(name=twistBasisJointName, radius=0.5)
     cmds.parent(twistBasisJoint, startJoint)
     cmds.matchTransform(twistBasisJoint, startJoint)
     # create up object to lock the rotation of the first twist joint
     cmds.select(cl=True)
-    upJoint = cmds.joint(name=startJoint.lstrip('JO') + 'TwistUp1')
-    cmds.setAttr('{0}.radius'.format(upJoint), 1)
+    upJoint = cmds.joint(name=f'{prefix}TwistUp1', radius=1)
     cmds.matchTransform(upJoint, startJoint)
     # cmds.delete(cmds.parentConstraint(startJoint, upJoint, mo=False, weight=True))
     # move up the locator along the up axis by 0.05 unit at local space
@@ -223,32 +258,24 @@ def setupCounterTwistJointChain(startJoint, endJoint=None, twistJointCount=3,
                      worldUpType='object', worldUpObject=upJoint)
     # create joint used to store the actual twist value: This is from Axel's prototype.
     cmds.select(twistBasisJoint)
-    twistValueJoint = cmds.joint(name=startJoint.lstrip('JO') + 'TwistValue1')
+    twistValueJoint = cmds.joint(name=f'{prefix}TwistValue1')
     cmds.aimConstraint(endJoint, twistValueJoint, aimVector=twistAxis, upVector=upAxis,
                      worldUpType='objectrotation', worldUpObject=startJoint, worldUpVector=upAxis)
     # create twist offset joint
     cmds.select(twistBasisJoint)
-    twistOffsetJoint = cmds.joint(name=startJoint.lstrip('JO') + 'BasisOffset1')
+    twistOffsetJoint = cmds.joint(name=f'{prefix}BasisOffset1')
 
     # use orient constraint to distribute the twisting along the joint chain.
-    orientConstraint = cmds.orientConstraint(twistOffsetJoint, twistValueJoint, twistJoints[0], mo=False, weight=1)[0]
-    # set orientConstraint interp Type to shortest
-    cmds.setAttr('{0}.interpType'.format(orientConstraint), 2)
-    cmds.setAttr('{0}.{1}W0'.format(orientConstraint, twistOffsetJoint), 0.9)
-    cmds.setAttr('{0}.{1}W1'.format(orientConstraint, twistValueJoint), 0.1)
+    # the first twist joint takes a tenth of the twist value
     weightUnit = 1.0 / (twistJointCount)
-    for index in range(1, twistJointCount):
-        orientConstraint = cmds.orientConstraint(twistOffsetJoint, twistValueJoint,
-                                               twistJoints[index], mo=False, weight=1)[0]
-        # set orientConstraint interp Type to shortest
-        cmds.setAttr('{0}.interpType'.format(orientConstraint), 2)
-        cmds.setAttr('{0}.{1}W0'.format(orientConstraint, twistOffsetJoint), (1 - weightUnit * index))
-        cmds.setAttr('{0}.{1}W1'.format(orientConstraint, twistValueJoint), weightUnit * index)
+    _distributeTwist(twistOffsetJoint, twistValueJoint, twistJoints,
+                     [0.1] + [weightUnit * index for index in range(1, twistJointCount)])
 
     # return all the dependencies
     return twistJoints, upJoint, twistBasisJoint
 
 
+@utils.batchSceneEdit('setupNonFlipTwistChain')
 def setupNonFlipTwistChain(startJoint, endJoint, upJoint, upAxis):
     """Prevent twist chain flipping.
     The upJoint will follow the startJoint within the range between the plane normals defined.
@@ -272,8 +299,9 @@ def setupNonFlipTwistChain(startJoint, endJoint, upJoint, upAxis):
         return
     # first parent joint to select: clavicle
     startJointParent = startJointParent[0]
+    prefix = startJoint.lstrip('JO')
     cmds.select(clear=True)
-    dotProductJoint = cmds.joint(name=startJoint.lstrip('JO') + 'Twist_{0}'.format(startJointParent.lstrip('JO'))) #LeftShoulder1Twist_LeftClavicle1
+    dotProductJoint = cmds.joint(name=f"{prefix}Twist_{startJointParent.lstrip('JO')}") #LeftShoulder1Twist_LeftClavicle1
     cmds.matchTransform(dotProductJoint, startJoint)
     cmds.parent(dotProductJoint, startJoint)
     cmds.setAttr('{0}.t'.format(dotProductJoint), 0, 0, 0)
@@ -285,9 +313,9 @@ def setupNonFlipTwistChain(startJoint, endJoint, upJoint, upAxis):
     # orientationLocator = cmds.spaceLocator(name=startJoint.lstrip('JO') + 'Orientation')[0]
     # cmds.delete(cmds.parentConstraint(startJoint, orientationLocator, mo=False, weight=1))
 
-    dotProductNode = cmds.shadingNode('vectorProduct', asUtility=True, name=startJoint.lstrip('JO') + '_DPN')
-    multMatrixNode = cmds.shadingNode('multMatrix', asUtility=True, name=startJoint.lstrip('JO') + '_MMN')
-    decomposeMatrixNode = cmds.shadingNode('decomposeMatrix', asUtility=True, name=startJoint.lstrip('JO') + '_DMN')
+    dotProductNode = cmds.shadingNode('vectorProduct', asUtility=True, name=f'{prefix}_DPN')
+    multMatrixNode = cmds.shadingNode('multMatrix', asUtility=True, name=f'{prefix}_MMN')
+    decomposeMatrixNode = cmds.shadingNode('decomposeMatrix', asUtility=True, name=f'{prefix}_DMN')
     cmds.connectAttr('{0}.worldMatrix'.format(dotProductJoint), '{0}.matrixIn[0]'.format(multMatrixNode))
     cmds.connectAttr('{0}.worldInverseMatrix'.format(startJoint), '{0}.matrixIn[1]'.format(multMatrixNode))
     cmds.connectAttr('{0}.matrixSum'.format(multMatrixNode), '{0}.inputMatrix'.format(decomposeMatrixNode))
@@ -300,34 +328,30 @@ def setupNonFlipTwistChain(startJoint, endJoint, upJoint, upAxis):
     upJointMatrix = om.MMatrix(cmds.getAttr('{0}.worldMatrix'.format(upJoint)))
     startJointMatrix = om.MMatrix(cmds.getAttr('{0}.worldMatrix'.format(startJoint)))
     offsetMatrix = upJointMatrix * startJointMatrix.inverse()
+    # both projections start from this pose (it is restored in between),
+    # so they are computed from a single query
+    endJointWs = om.MVector(cmds.xform(endJoint, q=True, ws=True, t=True))
+    projectionRotations = [_projectionRotation(startJointMatrix, endJointWs, om.MVector(upAxis), negative=negative)
+                           for negative in (False, True)]
 
-    def setDrivenKeys():
-        cmds.setDrivenKeyframe(upJoint + '.' + 'translateX', cd=dotProductNode + '.' + 'outputX',
-                             inTangentType='linear', outTangentType='linear')
-        cmds.setDrivenKeyframe(upJoint + '.' + 'translateY', cd=dotProductNode + '.' + 'outputX',
-                             inTangentType='linear', outTangentType='linear')
-        cmds.setDrivenKeyframe(upJoint + '.' + 'translateZ', cd=dotProductNode + '.' + 'outputX',
-                             inTangentType='linear', outTangentType='linear')
-
-    # create a temp dagpose
-    cmds.dagPose(startJoint, save=True, name='tempDagPose1')
-    setDrivenKeys()
+    driver = f'{dotProductNode}.outputX'
 
-    # rotate the joint chain to the plane
-    projectJointChainToPlane(startJoint, endJoint, upAxis)
-    # calculate upJoint position
-    calculateUpVecterPosition(startJoint, upJoint, offsetMatrix)
-    setDrivenKeys()
-
-    cmds.dagPose('tempDagPose1', restore=True)
+    def setDrivenKeys():
+        # key the three translate channels in one call
+        cmds.setDrivenKeyframe(upJoint, attribute=['translateX', 'translateY', 'translateZ'], cd=driver,
+                               inTangentType='linear', outTangentType='linear')
 
-    projectJointChainToPlane(startJoint, endJoint, upAxis, negative=True)
-    # calculate upJoint position
-    calculateUpVecterPosition(startJoint, upJoint, offsetMatrix)
+    # only the start joint rotation changes between the passes, save it to restore the rest pose
+    restRotation = cmds.getAttr('{0}.rotate'.format(startJoint))[0]
     setDrivenKeys()
 
-    cmds.dagPose('tempDagPose1', restore=True)
+    for quaternion in projectionRotations:
+        # rotate the joint chain to the plane
+        _rotateJointBy(startJoint, quaternion)
+        # calculate upJoint position
+        calculateUpVecterPosition(startJoint, upJoint, offsetMatrix)
+        setDrivenKeys()
 
-    cmds.delete('tempDagPose1')
+        cmds.setAttr('{0}.rotate'.format(startJoint), *restRotation)
 
     return dotProductJoint
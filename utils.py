@@ -1,191 +1,205 @@
 from . import muscle_template as template
 import maya.cmds as mc
+import maya.api.OpenMaya as om
 import logging
+import os
+import copy
 import json
+import contextlib
+import functools
 
 logger = logging.getLogger(__name__)
 
 
-# TrapeziusMuscles
-def getTrapeziusMuscles():
-    trapeziusData = {}
-    for side in ['Left', 'Right']:
-        trapeziusData[side] = {}
-
-        for muscleType in 'ABC':
-            if not mc.ls('{0}Trapezius{1}_muscleOrigin'.format(side, muscleType)) or not mc.ls(
-                    '{0}Trapezius{1}_muscleInsertion'.format(side, muscleType)):
-                logger.warning('Cannot find trapezius muscle setup on the {0} side'.format(side))
-                continue
-
-            muscleOrigin = mc.ls('{0}Trapezius{1}_muscleOrigin'.format(side, muscleType))[0]
-            muscleOriginPos = mc.xform(muscleOrigin, translation=True, q=True, ws=True)
-            muscleInsertion = mc.ls('{0}Trapezius{1}_muscleInsertion'.format(side, muscleType))[0]
-            muscleInsertionPos = mc.xform(muscleInsertion, translation=True, q=True, ws=True)
-            muscleCenter = mc.ls('{0}Trapezius{1}_muscleDriver'.format(side, muscleType))[0]
-            muscleCenterPos = mc.xform(muscleCenter, translation=True, q=True, ws=True)
-            trapeziusData[side].update({muscleOrigin: muscleOriginPos})
-            trapeziusData[side].update({muscleInsertion: muscleInsertionPos})
-            trapeziusData[side].update({muscleCenter: muscleCenterPos})
-
-    logger.info(trapeziusData)
-    return trapeziusData
+# suffixes of the locators saved for each muscle
+MUSCLE_LOCATOR_SUFFIXES = ('_muscleOrigin', '_muscleInsertion', '_muscleDriver')
+
+# exported muscle group -> (muscle name with {side} and {muscleType} fields, muscle types, missing setup warning)
+MUSCLE_GROUPS = {
+    'Trapezius': ('{side}Trapezius{muscleType}', 'ABC',
+                  'Cannot find trapezius muscle setup on the {side} side'),
+    'LatissimusDorsi': ('{side}LatissimusDorsi{muscleType}', 'AB',
+                        'Cannot find latissimus dorsi muscle setup for {muscleType} on the {side} side'),
+    'TerasMajor': ('{side}TerasMajor{muscleType}', [''],
+                   'Cannot find teras major muscle setup on the {side} side'),
+    'PectoralisMajor': ('{side}PectoralisMajor{muscleType}', 'AB',
+                        'Cannot find pectoralis major muscle setup on the {side} side'),
+    'Deltoid': ('{side}Deltoid{muscleType}', 'ABC',
+                'Cannot find deltoid muscle setup on the {side} side'),
+    'Arms': ('{side}{muscleType}', ['Bicep', 'Tricep'],
+             'Cannot find arm muscle setup on the {side} side'),
+}
+
+
+def getExistingMuscleLocators():
+    """Get the names of all the muscle locators in the scene, to share one scene query between the getters"""
+    return set(mc.ls(['*' + suffix for suffix in MUSCLE_LOCATOR_SUFFIXES]))
+
+
+def _getMuscleLocators(namePattern, muscleTypes, warning, existing=None):
+    """
+    Get the world positions of the origin, insertion and driver locators of the muscles on both sides.
+    A muscle missing any of its locators is skipped with the warning.
+    :param namePattern: (str) The muscle name with {side} and {muscleType} fields, e.g. '{side}Trapezius{muscleType}'.
+    :param muscleTypes: (iterable) The muscle types filled into the name, [''] when the muscle has no types.
+    :param warning: (str) The message logged with {side} and {muscleType} when a muscle setup is missing.
+    :param existing: (set, optional) The names of the muscle locators in the scene from getExistingMuscleLocators,
+      or None to query them here. Default is None.
+    :return: (dict) {side: {locator name: world position}}
+    """
+    sides = ['Left', 'Right']
+    muscleNames = [(side, namePattern.format(side=side, muscleType=muscleType), muscleType)
+                   for side in sides for muscleType in muscleTypes]
+    if existing is None:
+        # one existence query for all the locators
+        existing = set(mc.ls([muscleName + suffix for _, muscleName, _ in muscleNames
+                              for suffix in MUSCLE_LOCATOR_SUFFIXES]))
+
+    locators = []
+    for side, muscleName, muscleType in muscleNames:
+        # the import sets all the locators of a muscle, export a muscle only when it is complete
+        if any(muscleName + suffix not in existing for suffix in MUSCLE_LOCATOR_SUFFIXES):
+            logger.warning(warning.format(side=side, muscleType=muscleType))
+            continue
+        locators.extend((side, muscleName + suffix) for suffix in MUSCLE_LOCATOR_SUFFIXES)
 
+    musclesData = {side: {} for side in sides}
+    # read the world positions through the API instead of an xform query
+    selList = om.MSelectionList()
+    for _, locator in locators:
+        selList.add(locator)
+    for index, (side, locator) in enumerate(locators):
+        worldMatrix = selList.getDagPath(index).inclusiveMatrix()
+        musclesData[side][locator] = [worldMatrix[12], worldMatrix[13], worldMatrix[14]]
 
-# LatissimusDorsiMuscles
-def getLatissimusDorsiMuscles():
-    latissimusDorsiData = {}
-    for side in ['Left', 'Right']:
-        latissimusDorsiData[side] = {}
-        for muscleType in 'AB':
-            if not mc.ls('{0}LatissimusDorsi{1}_muscleOrigin'.format(side, muscleType)) or not mc.ls(
-                    '{0}LatissimusDorsi{1}_muscleInsertion'.format(side, muscleType)):
-                logger.warning(
-                    'Cannot find latissimus dorsi muscle setup for {0} on the {1} side'.format(muscleType, side))
-                continue
-
-            muscleOrigin = mc.ls('{0}LatissimusDorsi{1}_muscleOrigin'.format(side, muscleType))[0]
-            muscleOriginPos = mc.xform(muscleOrigin, translation=True, q=True, ws=True)
-            muscleInsertion = mc.ls('{0}LatissimusDorsi{1}_muscleInsertion'.format(side, muscleType))[0]
-            muscleInsertionPos = mc.xform(muscleInsertion, translation=True, q=True, ws=True)
-            muscleCenter = mc.ls('{0}LatissimusDorsi{1}_muscleDriver'.format(side, muscleType))[0]
-            muscleCenterPos = mc.xform(muscleCenter, translation=True, q=True, ws=True)
-            latissimusDorsiData[side].update({muscleOrigin: muscleOriginPos})
-            latissimusDorsiData[side].update({muscleInsertion: muscleInsertionPos})
-            latissimusDorsiData[side].update({muscleCenter: muscleCenterPos})
-
-    logger.info(latissimusDorsiData)
-    return latissimusDorsiData
+    logger.debug('%s', musclesData)
+    return musclesData
 
 
-# TerasMajorMuscles
-def getTerasMajorMuscles():
-    terasMajorData = {}
-    for side in ['Left', 'Right']:
-        terasMajorData[side] = {}
-        if not mc.ls('{0}TerasMajor_muscleOrigin'.format(side)) or not mc.ls(
-                '{0}TerasMajor_muscleInsertion'.format(side)):
-            logger.warning('Cannot find teras major muscle setup on the {0} side'.format(side))
-            continue
+def getMuscleGroup(group, existing=None):
+    """Get the locator positions of one of the MUSCLE_GROUPS, see _getMuscleLocators"""
+    namePattern, muscleTypes, warning = MUSCLE_GROUPS[group]
+    return _getMuscleLocators(namePattern, muscleTypes, warning, existing)
 
-        muscleOrigin = mc.ls('{0}TerasMajor_muscleOrigin'.format(side))[0]
-        muscleOriginPos = mc.xform(muscleOrigin, translation=True, q=True, ws=True)
-        muscleInsertion = mc.ls('{0}TerasMajor_muscleInsertion'.format(side))[0]
-        muscleInsertionPos = mc.xform(muscleInsertion, translation=True, q=True, ws=True)
-        muscleCenter = mc.ls('{0}TerasMajor_muscleDriver'.format(side))[0]
-        muscleCenterPos = mc.xform(muscleCenter, translation=True, q=True, ws=True)
-        terasMajorData[side].update({muscleOrigin: muscleOriginPos})
-        terasMajorData[side].update({muscleInsertion: muscleInsertionPos})
-        terasMajorData[side].update({muscleCenter: muscleCenterPos})
 
-    logger.info(terasMajorData)
-    return terasMajorData
+# TrapeziusMuscles
+def getTrapeziusMuscles(existing=None):
+    return getMuscleGroup('Trapezius', existing)
 
 
 # LatissimusDorsiMuscles
-def getPectoralisMajorMuscles():
-    pectoralisMajorData = {}
-    for side in ['Left', 'Right']:
-        pectoralisMajorData[side] = {}
-        for muscleType in 'AB':
-            if not mc.ls('{0}PectoralisMajor{1}_muscleOrigin'.format(side, muscleType)) or not mc.ls(
-                    '{0}PectoralisMajor{1}_muscleInsertion'.format(side, muscleType)):
-                logger.warning('Cannot find pectoralis major muscle setup on the {0} side'.format(side))
-                continue
-
-            muscleOrigin = mc.ls('{0}PectoralisMajor{1}_muscleOrigin'.format(side, muscleType))[0]
-            muscleOriginPos = mc.xform(muscleOrigin, translation=True, q=True, ws=True)
-            muscleInsertion = mc.ls('{0}PectoralisMajor{1}_muscleInsertion'.format(side, muscleType))[0]
-            muscleInsertionPos = mc.xform(muscleInsertion, translation=True, q=True, ws=True)
-            muscleCenter = mc.ls('{0}PectoralisMajor{1}_muscleDriver'.format(side, muscleType))[0]
-            muscleCenterPos = mc.xform(muscleCenter, translation=True, q=True, ws=True)
-            pectoralisMajorData[side].update({muscleOrigin: muscleOriginPos})
-            pectoralisMajorData[side].update({muscleInsertion: muscleInsertionPos})
-            pectoralisMajorData[side].update({muscleCenter: muscleCenterPos})
-
-    logger.info(pectoralisMajorData)
-    return pectoralisMajorData
+def getLatissimusDorsiMuscles(existing=None):
+    return getMuscleGroup('LatissimusDorsi', existing)
 
 
-# Deltoid
-def getDeltoidMuscles():
-    deltoidData = {}
-    for side in ['Left', 'Right']:
-        deltoidData[side] = {}
-        for muscleType in 'ABC':
-            if not mc.ls('{0}Deltoid{1}_muscleOrigin'.format(side, muscleType)) or not mc.ls(
-                    '{0}Deltoid{1}_muscleInsertion'.format(side, muscleType)):
-                logger.warning('Cannot find deltoid muscle setup on the {0} side'.format(side))
-                continue
-
-            muscleOrigin = mc.ls('{0}Deltoid{1}_muscleOrigin'.format(side, muscleType))[0]
-            muscleOriginPos = mc.xform(muscleOrigin, translation=True, q=True, ws=True)
-            muscleInsertion = mc.ls('{0}Deltoid{1}_muscleInsertion'.format(side, muscleType))[0]
-            muscleInsertionPos = mc.xform(muscleInsertion, translation=True, q=True, ws=True)
-            muscleCenter = mc.ls('{0}Deltoid{1}_muscleDriver'.format(side, muscleType))[0]
-            muscleCenterPos = mc.xform(muscleCenter, translation=True, q=True, ws=True)
-            deltoidData[side].update({muscleOrigin: muscleOriginPos})
-            deltoidData[side].update({muscleInsertion: muscleInsertionPos})
-            deltoidData[side].update({muscleCenter: muscleCenterPos})
-
-    logger.info(deltoidData)
-    return deltoidData
-
-
-# ArmMuscles
-def getArmMuscles():
-    armMusclesData = {}
-    for side in ['Left', 'Right']:
-        armMusclesData[side] = {}
-        for muscleType in ['Bicep', 'Tricep']:
-            if not mc.ls('{0}{1}_muscleOrigin'.format(side, muscleType)) or not mc.ls(
-                    '{0}{1}_muscleInsertion'.format(side, muscleType)):
-                logger.warning('Cannot find arm muscle setup on the {0} side'.format(side))
-                continue
-
-            muscleOrigin = mc.ls('{0}{1}_muscleOrigin'.format(side, muscleType))[0]
-            muscleOriginPos = mc.xform(muscleOrigin, translation=True, q=True, ws=True)
-            muscleInsertion = mc.ls('{0}{1}_muscleInsertion'.format(side, muscleType))[0]
-            muscleInsertionPos = mc.xform(muscleInsertion, translation=True, q=True, ws=True)
-            muscleCenter = mc.ls('{0}{1}_muscleDriver'.format(side, muscleType))[0]
-            muscleCenterPos = mc.xform(muscleCenter, translation=True, q=True, ws=True)
-            armMusclesData[side].update({muscleOrigin: muscleOriginPos})
-            armMusclesData[side].update({muscleInsertion: muscleInsertionPos})
-            armMusclesData[side].update({muscleCenter: muscleCenterPos})
-
-    logger.info(armMusclesData)
-    return armMusclesData
-
+# TerasMajorMuscles
+def getTerasMajorMuscles(existing=None):
+    return getMuscleGroup('TerasMajor', existing)
 
-def exportMuscles(filePath):
-    musclesData = {}
-    trapeziusData = getTrapeziusMuscles()
-    musclesData['Trapezius'] = trapeziusData
 
-    latissimusDorsiData = getLatissimusDorsiMuscles()
-    musclesData["LatissimusDorsi"] = latissimusDorsiData
+# LatissimusDorsiMuscles
+def getPectoralisMajorMuscles(existing=None):
+    return getMuscleGroup('PectoralisMajor', existing)
 
-    terasMajorData = getTerasMajorMuscles()
-    musclesData["TerasMajor"] = terasMajorData
 
-    pectoralisMajorData = getPectoralisMajorMuscles()
-    musclesData["PectoralisMajor"] = pectoralisMajorData
+# Deltoid
+def getDeltoidMuscles(existing=None):
+    return getMuscleGroup('Deltoid', existing)
 
-    deltoidData = getDeltoidMuscles()
-    musclesData["Deltoid"] = deltoidData
 
-    armsData = getArmMuscles()
-    musclesData["Arms"] = armsData
+# ArmMuscles
+def getArmMuscles(existing=None):
+    return getMuscleGroup('Arms', existing)
 
-    logger.info(musclesData)
 
-    with open(filePath, 'w') as fp:
-        json.dump(musclesData, fp, ensure_ascii=False, indent=4, separators=(',', ': '), sort_keys=True)
+def _dumpJson(data):
+    """Encode the data as indented json with sorted keys"""
+    return json.dumps(data, ensure_ascii=False, indent=4, separators=(',', ': '), sort_keys=True)
 
 
-def generateMusclesFromFile(filePath):
+def exportMuscles(filePath):
+    # look up the muscle locators in the scene once for all the muscle groups
+    existing = getExistingMuscleLocators()
+    # indent of the encoder used by _dumpJson
+    indent = '    '
+    # write the muscle groups one by one as they are queried, in sorted order,
+    # the file is the same as dumping the whole muscles data at once.
+    # They are streamed into a temp file next to the target, which only replaces the previous export
+    # once it is complete, so a failed query doesn't leave a truncated file behind
+    tempPath = filePath + '.tmp'
+    try:
+        with open(tempPath, 'w') as fp:
+            fp.write('{')
+            for index, group in enumerate(sorted(MUSCLE_GROUPS)):
+                groupJson = _dumpJson(getMuscleGroup(group, existing)).replace('\n', '\n' + indent)
+                fp.write('{0}\n{1}{2}: {3}'.format(',' if index else '', indent, json.dumps(group), groupJson))
+            fp.write('\n}')
+        os.replace(tempPath, filePath)
+    except Exception:
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+        raise
+
+
+@functools.lru_cache(maxsize=4)
+def _loadMusclesFile(filePath, mtimeNs, size):
+    """
+    Parse a muscles file, cached by its path, modification time in nanoseconds and size so the generators
+    can share one parse of an unchanged file. The returned data is shared, copy it before handing it out.
+    """
     with open(filePath) as fp:
-        musclesData = json.load(fp)
+        return json.load(fp)
+
+
+def loadMusclesFile(filePath):
+    """Get the muscles data saved in the file by exportMuscles, the caller is free to modify it"""
+    stat = os.stat(filePath)
+    return copy.deepcopy(_loadMusclesFile(filePath, stat.st_mtime_ns, stat.st_size))
+
+
+# number of batchSceneEdit blocks currently open
+_batchSceneEditDepth = 0
+
+
+@contextlib.contextmanager
+def batchSceneEdit(chunkName):
+    """
+    Run a batch of scene edits as a single undo chunk, with viewport refresh suspended and the evaluation
+    manager switched to DG so the edits don't trigger a redraw or graph rebuild each. The cycle check is off
+    while the half-built graph is wired up. The viewport is redrawn once at the end.
+    Shared by the UI handlers, the muscle generators and the rollBone setups. A nested batch runs inside
+    the outer one, only the outermost batch opens the undo chunk and switches the scene settings.
+    """
+    global _batchSceneEditDepth
+    if _batchSceneEditDepth:
+        _batchSceneEditDepth += 1
+        try:
+            yield
+        finally:
+            _batchSceneEditDepth -= 1
+        return
+
+    evaluationMode = mc.evaluationManager(query=True, mode=True)[0]
+    cycleCheck = mc.cycleCheck(query=True, evaluation=True)
+    mc.undoInfo(openChunk=True, chunkName=chunkName)
+    mc.refresh(suspend=True)
+    mc.evaluationManager(mode='off')
+    mc.cycleCheck(evaluation=False)
+    _batchSceneEditDepth += 1
+    try:
+        yield
+    finally:
+        _batchSceneEditDepth -= 1
+        mc.cycleCheck(evaluation=cycleCheck)
+        mc.evaluationManager(mode=evaluationMode)
+        mc.refresh(suspend=False)
+        mc.undoInfo(closeChunk=True)
+        mc.refresh(force=True)
+
+
+@batchSceneEdit('generateMusclesFromFile')
+def generateMusclesFromFile(filePath):
+    musclesData = loadMusclesFile(filePath)
     # trapezius
     trapeziusData = musclesData.get('Trapezius')
 
@@ -193,34 +207,19 @@ def generateMusclesFromFile(filePath):
         for side in trapeziusData.keys():
             builder = template.TrapeziusMuscles(side=side)
             builder.add()
-            # Trap A
-            originPos = trapeziusData.get(side).get('{0}TrapeziusA_muscleOrigin'.format(side))
-            mc.xform(builder.trapeziusA.originLoc, translation=originPos, ws=True)
-            insertionPos = trapeziusData.get(side).get('{0}TrapeziusA_muscleInsertion'.format(side))
-            mc.xform(builder.trapeziusA.insertionLoc, translation=insertionPos, ws=True)
-            centerPos = trapeziusData.get(side).get('{0}TrapeziusA_muscleDriver'.format(side))
-
-            mc.xform(builder.trapeziusA.centerLoc, translation=centerPos, ws=True)
-            # Trap B
-            originPos = trapeziusData.get(side).get('{0}TrapeziusB_muscleOrigin'.format(side))
-            mc.xform(builder.trapeziusB.originLoc, translation=originPos, ws=True)
-            insertionPos = trapeziusData.get(side).get('{0}TrapeziusB_muscleInsertion'.format(side))
-            mc.xform(builder.trapeziusB.insertionLoc, translation=insertionPos, ws=True)
-            centerPos = trapeziusData.get(side).get('{0}TrapeziusB_muscleDriver'.format(side))
-            mc.xform(builder.trapeziusB.centerLoc, translation=centerPos, ws=True)
-            # Trap C
-            originPos = trapeziusData.get(side).get('{0}TrapeziusC_muscleOrigin'.format(side))
-            mc.xform(builder.trapeziusC.originLoc, translation=originPos, ws=True)
-            insertionPos = trapeziusData.get(side).get('{0}TrapeziusC_muscleInsertion'.format(side))
-            mc.xform(builder.trapeziusC.insertionLoc, translation=insertionPos, ws=True)
-            centerPos = trapeziusData.get(side).get('{0}TrapeziusC_muscleDriver'.format(side))
-            mc.xform(builder.trapeziusC.centerLoc, translation=centerPos, ws=True)
+            sideData = trapeziusData[side]
+            for region, trapezius in zip('ABC', (builder.trapeziusA, builder.trapeziusB, builder.trapeziusC)):
+                muscleName = f'{side}Trapezius{region}'
+                # origin, insertion and driver locators in the order of MUSCLE_LOCATOR_SUFFIXES
+                locators = (trapezius.originLoc, trapezius.insertionLoc, trapezius.centerLoc)
+                for locator, suffix in zip(locators, MUSCLE_LOCATOR_SUFFIXES):
+                    mc.xform(locator, translation=sideData[muscleName + suffix], ws=True)
             builder.finalize()
 
 
+@batchSceneEdit('generateMusclesBpObjects')
 def generateMusclesBpObjects(filePath):
-    with open(filePath) as fp:
-        musclesData = json.load(fp)
+    musclesData = loadMusclesFile(filePath)
 
     # trapezius:
     trapeziusData = musclesData.get('Trapezius')
@@ -229,24 +228,22 @@ def generateMusclesBpObjects(filePath):
         for side in trapeziusData.keys():
             sideGroup = mc.group(world=True, empty=True, name=f"{side}")
             mc.parent(sideGroup, trapGroup)
+            sideData = trapeziusData[side]
+            bpObjects = []
             for region in "ABC":
-                originPos = trapeziusData.get(side).get(f'{side}Trapezius{region}_muscleOrigin')
-                insertionPos = trapeziusData.get(side).get(f'{side}Trapezius{region}_muscleInsertion')
-                centerPos = trapeziusData.get(side).get(f'{side}Trapezius{region}_muscleDriver')
-
-                bpOrigin = mc.createNode("joint", name=f"bp{side}Trapezius{region}_muscleOrigin")
-                bpInsertion = mc.createNode("joint", name=f"bp{side}Trapezius{region}_muscleInsertion")
-                bpCenter = mc.createNode("joint", name=f"bp{side}Trapezius{region}_muscleDriver")
+                muscleName = f"{side}Trapezius{region}"
+                # origin, insertion and driver bp objects, named after the saved locators
+                for suffix in MUSCLE_LOCATOR_SUFFIXES:
+                    bpObject = mc.createNode("joint", name="bp" + muscleName + suffix)
+                    mc.xform(bpObject, translation=sideData.get(muscleName + suffix), worldSpace=True)
+                    bpObjects.append(bpObject)
+
+                bpCenter = bpObjects[-1]
                 mc.setAttr(f"{bpCenter}.radius", 2.0)
                 mc.setAttr(f"{bpCenter}.overrideEnabled", 1)
                 mc.setAttr(f"{bpCenter}.overrideColor", 13)  # 13 = red
-                mc.xform(bpOrigin, translation=originPos, worldSpace=True)
-                mc.xform(bpInsertion, translation=insertionPos, worldSpace=True)
-                mc.xform(bpCenter, translation=centerPos, worldSpace=True)
-                # parent bp objects to group
-                mc.parent(bpOrigin, sideGroup)
-                mc.parent(bpInsertion, sideGroup)
-                mc.parent(bpCenter, sideGroup)
+            # parent bp objects to group
+            mc.parent(bpObjects, sideGroup)
 
 
 def generateMusclesFromBpObjects():